@@ -1,14 +1,27 @@
 """The Elica Getup integration."""
 import logging
-import aiohttp
-import asyncio
-from datetime import timedelta
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.const import Platform
-
-from .const import DOMAIN, URL_TOKEN, URL_DEVICES, AUTH_BASIC
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .api import ElicaApi
+from .commands import ElicaCommandQueue
+from .const import (
+    DOMAIN,
+    STORAGE_VERSION,
+    CONF_COMMAND_WINDOW,
+    DEFAULT_COMMAND_WINDOW,
+    DATA_FLOW_CACHE,
+    CONF_RECORD_TRAFFIC,
+    DATA_SCHEDULER,
+    MAX_CONCURRENT_REQUESTS,
+)
+from .coordinator import ElicaCoordinator
+from .recorder import ElicaTrafficRecorder
+from .scheduler import ElicaScheduler
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,107 +30,71 @@ PLATFORMS = [Platform.LIGHT, Platform.FAN, Platform.SENSOR, Platform.COVER]
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Elica Getup component from yaml configuration."""
-    # This is kept for backward compatibility but does nothing
+    # YAML configuration is kept for backward compatibility but does nothing
     # Users should migrate to config flow
+    hass.data[DATA_SCHEDULER] = ElicaScheduler(async_get_clientsession(hass), MAX_CONCURRENT_REQUESTS)
+    await async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Elica Getup from a config entry."""
-    username = entry.data["username"]
-    password = entry.data["password"]
-    app_uuid = entry.data["app_uuid"]
-    device_name = entry.data.get("device_name", "Elica Getup")
+    scheduler: ElicaScheduler = hass.data[DATA_SCHEDULER]
+    session = scheduler.session
+    recorder = None
+    if entry.options.get(CONF_RECORD_TRAFFIC):
+        recorder = ElicaTrafficRecorder(Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.traffic"))
+        await recorder.async_load()
+        session = recorder.wrap(session)
+    api = ElicaApi(
+        session,
+        entry.data["username"],
+        entry.data["password"],
+        entry.data["app_uuid"],
+        Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.token"),
+        scheduler.semaphore,
+    )
+    await api.tokens.async_load()
+    entry.async_on_unload(api.tokens.stop)
+    entry.async_on_unload(api.profiler.stop)
+    commands = ElicaCommandQueue(
+        hass,
+        api,
+        entry.options.get(CONF_COMMAND_WINDOW, DEFAULT_COMMAND_WINDOW) / 1000,
+        Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.outbox"),
+    )
+    await commands.async_load()
+    entry.async_on_unload(commands.async_stop)
+    coordinator = ElicaCoordinator(hass, entry, api, commands, scheduler)
+    entry.async_on_unload(scheduler.register(entry.entry_id))
+    entry.async_on_unload(coordinator.transitions.async_stop)
+
+    # Start from the data the config flow just fetched, or from the last
+    # persisted snapshot while the cloud is refreshed in the background, so a
+    # slow cloud doesn't hold up startup
+    cached = hass.data.get(DATA_FLOW_CACHE, {}).pop(entry.data["username"], None)
+    if cached is not None:
+        await api.tokens.async_set_token(cached["token"], cached["expires_at"])
+    if cached is not None and cached["devices"]:
+        coordinator.async_set_devices(cached["devices"])
+    elif await coordinator.async_restore():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
-        "token": None,
-        "devices": [],
-        "app_uuid": app_uuid,
-        "username": username,
-        "password": password,
-        "device_name": device_name,
+        "api": api,
+        "coordinator": coordinator,
+        "recorder": recorder,
     }
 
-    async def update_elica_data(now=None):
-        """Update data from Elica cloud."""
-        entry_data = hass.data[DOMAIN][entry.entry_id]
-        
-        async with aiohttp.ClientSession() as session:
-            # Get token if we don't have one
-            if entry_data["token"] is None:
-                auth = {
-                    'scope': 'default',
-                    'grant_type': 'password',
-                    'username': username,
-                    'password': password,
-                    'app_uuid': app_uuid
-                }
-                try:
-                    async with session.post(
-                        URL_TOKEN,
-                        data=auth,
-                        headers={'Authorization': AUTH_BASIC}
-                    ) as resp:
-                        if resp.status == 200:
-                            result = await resp.json()
-                            entry_data["token"] = result.get("access_token")
-                        else:
-                            _LOGGER.error("Failed to get token: %s", resp.status)
-                            return
-                except Exception as err:
-                    _LOGGER.error("Error getting token: %s", err)
-                    return
-
-            # Get devices
-            headers = {
-                'Authorization': f'Bearer {entry_data["token"]}',
-                'App-Uuid': app_uuid
-            }
-            try:
-                async with session.get(URL_DEVICES, headers=headers) as resp:
-                    if resp.status == 200:
-                        devices = await resp.json()
-                        if not isinstance(devices, list):
-                            devices = [devices]
-                        
-                        # Process devices
-                        processed = []
-                        for device in devices:
-                            dm = device.get("dataModel", {})
-                            for key in ["64", "71", "96", "110", "53"]:
-                                if key in dm:
-                                    device[key] = int(dm[key])
-                            
-                            # Process filters
-                            for f in device.get("filters", []):
-                                if f.get("type") == "charcoal":
-                                    device["filter_charcoal"] = f.get("efficiency", 0)
-                                elif f.get("type") == "grease":
-                                    device["filter_grease"] = f.get("efficiency", 0)
-                            
-                            processed.append(device)
-                        
-                        entry_data["devices"] = processed
-                    elif resp.status == 401:
-                        # Token expired, reset it
-                        entry_data["token"] = None
-                        _LOGGER.warning("Token expired, will refresh on next update")
-                    else:
-                        _LOGGER.error("Failed to get devices: %s", resp.status)
-            except Exception as err:
-                _LOGGER.error("Error getting devices: %s", err)
-
-    # Initial data fetch
-    await update_elica_data()
-
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Schedule periodic updates
-    entry.async_on_unload(
-        async_track_time_interval(hass, update_elica_data, timedelta(seconds=60))
-    )
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
@@ -129,4 +106,16 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
 
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+
+async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored token, snapshot, outbox and traffic when a config entry is deleted."""
+    for name in ("token", "snapshot", "outbox", "traffic"):
+        await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.{name}").async_remove()
\ No newline at end of file
@@ -0,0 +1,262 @@
+"""Client for the Elica cloud API."""
+import asyncio
+import hashlib
+import json
+import logging
+import contextlib
+import time
+from collections.abc import Mapping
+import aiohttp
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .auth import ElicaTokenManager
+from .breaker import ElicaCircuitBreaker
+from .const import (
+    URL_TOKEN,
+    URL_DEVICES,
+    URL_PRESETS_START,
+    AUTH_BASIC,
+    RATE_LIMIT_PER_MINUTE,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_RESERVE,
+    TIMEOUT_TOKEN,
+    TIMEOUT_POLL,
+    TIMEOUT_COMMAND,
+    BREAKER_THRESHOLD,
+    BREAKER_PROBE_DELAY,
+    BREAKER_PROBE_DELAY_MAX,
+)
+from .limiter import ElicaRateLimiter, PRIORITY_COMMAND, PRIORITY_DIAGNOSTIC, PRIORITY_POLL
+from .metrics import ElicaMetrics, LatencyHistogram
+from .profiler import ElicaProfiler
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ElicaApiError(HomeAssistantError):
+    """Error to indicate a failed request to the Elica cloud."""
+
+
+class ElicaAuthError(ElicaApiError):
+    """Error to indicate the Elica cloud rejected the credentials or token."""
+
+
+class ElicaConnectionError(ElicaApiError):
+    """Error to indicate the Elica cloud could not be reached or failed to answer."""
+
+
+class ElicaCircuitOpenError(ElicaApiError):
+    """Error to indicate a request was not sent because the cloud is considered down."""
+
+
+class ElicaRateLimitedError(ElicaApiError):
+    """Error to indicate a background request was dropped to save request budget."""
+
+
+class ElicaApi:
+    """Elica cloud client sharing one pooled aiohttp session.
+
+    When a semaphore is given, HTTP exchanges wait for it, capping the
+    requests in flight across every client that shares it.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        username: str,
+        password: str,
+        app_uuid: str,
+        store: Store | None = None,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        self._session = session
+        self._slot = semaphore or contextlib.nullcontext()
+        self._username = username
+        self._password = password
+        self.app_uuid = app_uuid
+        self.tokens = ElicaTokenManager(self._async_fetch_token, store)
+        self.metrics = ElicaMetrics()
+        self.profiler = ElicaProfiler()
+        # Validators of the last device list, for conditional polls
+        self._etag: str | None = None
+        self._digest: bytes | None = None
+        self.limiter = ElicaRateLimiter(RATE_LIMIT_PER_MINUTE / 60, RATE_LIMIT_BURST, RATE_LIMIT_RESERVE)
+        self.breaker = ElicaCircuitBreaker(BREAKER_THRESHOLD, BREAKER_PROBE_DELAY, BREAKER_PROBE_DELAY_MAX)
+
+    async def async_authenticate(self) -> str:
+        """Fetch a new access token."""
+        return await self.tokens.async_refresh()
+
+    async def _async_fetch_token(self) -> tuple[str, int | None]:
+        self.metrics.token_refreshes += 1
+        with self.profiler.span("token_fetch"):
+            return await self._async_request_token()
+
+    async def _async_request_token(self) -> tuple[str, int | None]:
+        auth = {
+            'scope': 'default',
+            'grant_type': 'password',
+            'username': self._username,
+            'password': self._password,
+            'app_uuid': self.app_uuid
+        }
+        try:
+            # Time out the exchange itself, not the wait for a slot
+            async with self._slot, asyncio.timeout(TIMEOUT_TOKEN), self._session.request(
+                "POST", URL_TOKEN, data=auth, headers={'Authorization': AUTH_BASIC}
+            ) as resp:
+                if resp.status >= 500:
+                    raise ElicaConnectionError(f"Failed to get token: {resp.status}")
+                if resp.status != 200:
+                    raise ElicaAuthError(f"Failed to get token: {resp.status}")
+                result = await resp.json()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise ElicaConnectionError(f"Error getting token: {err!r}") from err
+        except ValueError as err:
+            raise ElicaConnectionError(f"Invalid token response: {err}") from err
+
+        if not isinstance(result, dict):
+            raise ElicaConnectionError(f"Invalid token response: {type(result).__name__}")
+        if not result.get("access_token"):
+            raise ElicaAuthError("No access token in response")
+        return result["access_token"], result.get("expires_in")
+
+    async def _async_call(
+        self,
+        method: str,
+        url: str,
+        latency: LatencyHistogram,
+        priority: int = PRIORITY_COMMAND,
+        decode: bool = True,
+        timeout: float = TIMEOUT_COMMAND,
+        **kwargs,
+    ):
+        """Make an authenticated request within the rate limit and record its outcome.
+
+        Returns the decoded body, or the status, headers and raw body when
+        decode is False.
+        """
+        if not self.breaker.allow():
+            raise ElicaCircuitOpenError(
+                f"Elica cloud unreachable, not sending {method} {url} (next attempt in {self.breaker.retry_in:.0f}s)"
+            )
+        try:
+            if priority == PRIORITY_COMMAND:
+                await self.limiter.async_acquire(priority)
+            elif not self.limiter.try_acquire(priority):
+                raise ElicaRateLimitedError(f"Skipped {method} {url} to keep request budget for commands")
+            start = time.monotonic()
+            status, headers, body = await self._async_authorized_request(method, url, timeout, **kwargs)
+        except ElicaConnectionError:
+            self.metrics.failures += 1
+            self.breaker.record_failure()
+            raise
+        except ElicaRateLimitedError:
+            self.breaker.release()
+            raise
+        except ElicaApiError:
+            # The cloud answered, so it is reachable
+            self.metrics.failures += 1
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            # Cancelled, or a bug: don't leave a probe holding the breaker
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        self.metrics.successes += 1
+        latency.observe(time.monotonic() - start)
+        if decode:
+            return self._decode(method, url, body)
+        return status, headers, body
+
+    async def _async_authorized_request(self, method: str, url: str, timeout: float, **kwargs):
+        """Send the request with a bearer token, renewing the token once on a 401."""
+        extra_headers = kwargs.pop("headers", {})
+        for attempt in range(2):
+            token = await self.tokens.async_get_token()
+            headers = {**extra_headers, 'Authorization': f'Bearer {token}', 'App-Uuid': self.app_uuid}
+            response = await self._async_request(method, url, timeout, headers=headers, **kwargs)
+            if response[0] != 401:
+                return response
+            self.metrics.unauthorized += 1
+            self.tokens.invalidate(token)
+            if attempt == 0:
+                _LOGGER.debug("Token rejected, renewing and retrying %s %s", method, url)
+        raise ElicaAuthError(f"{method} {url} rejected the renewed token")
+
+    async def _async_request(self, method: str, url: str, timeout: float, **kwargs) -> tuple[int, Mapping, bytes]:
+        """Perform one HTTP exchange, returning the status, headers and raw body."""
+        try:
+            async with self._slot, asyncio.timeout(timeout), self._session.request(method, url, **kwargs) as resp:
+                if resp.status == 401:
+                    return resp.status, resp.headers, b""
+                if resp.status >= 500:
+                    raise ElicaConnectionError(f"{method} {url} failed: {resp.status}")
+                if resp.status >= 400:
+                    raise ElicaApiError(f"{method} {url} failed: {resp.status}")
+                return resp.status, resp.headers, await resp.read()
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise ElicaConnectionError(f"Error calling {method} {url}: {err!r}") from err
+
+    def _decode(self, method: str, url: str, body: bytes):
+        with self.profiler.span("json_decode", sync=True):
+            try:
+                return json.loads(body) if body else None
+            except ValueError as err:
+                raise ElicaApiError(f"{method} {url} returned invalid JSON: {err}") from err
+
+    async def async_get_devices(self, conditional: bool = False) -> list | None:
+        """Return the raw device list.
+
+        When conditional, return None without decoding anything if the list
+        is unchanged since the last call: the cloud answers 304 to the last
+        ETag, or the body hashes the same as last time.
+        """
+        headers = {"If-None-Match": self._etag} if conditional and self._etag else {}
+        with self.profiler.span("devices_get"):
+            status, resp_headers, body = await self._async_call(
+                "GET",
+                URL_DEVICES,
+                self.metrics.poll_latency,
+                PRIORITY_POLL,
+                decode=False,
+                timeout=TIMEOUT_POLL,
+                headers=headers,
+            )
+        self.metrics.last_poll_success = dt_util.utcnow()
+        if status == 304:
+            self.metrics.unchanged_polls += 1
+            return None
+        self._etag = resp_headers.get("ETag")
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if conditional and digest == self._digest:
+            self.metrics.unchanged_polls += 1
+            return None
+        self._digest = digest
+        devices = self._decode("GET", URL_DEVICES, body)
+        if not isinstance(devices, list):
+            devices = [devices]
+        return devices
+
+    async def async_get_raw_devices(self) -> object:
+        """Return the device list exactly as the cloud sends it, for diagnostics."""
+        return await self._async_call(
+            "GET", URL_DEVICES, self.metrics.poll_latency, PRIORITY_DIAGNOSTIC, timeout=TIMEOUT_POLL
+        )
+
+    async def async_send_capabilities(self, device_id: str, caps: dict) -> None:
+        """Send a capabilities command to a hood."""
+        payload = {"type": "Hood", "name": "capabilities", "async": True, "capabilities": caps}
+        await self._async_call(
+            "POST", f"{URL_DEVICES}/{device_id}/commands", self.metrics.command_latency, decode=False, json=payload
+        )
+
+    async def async_start_preset(self, device_id: str, preset_id: str) -> None:
+        """Start a preset stored in the Elica account on a hood."""
+        payload = {"deviceId": device_id, "presetId": preset_id}
+        await self._async_call(
+            "POST", URL_PRESETS_START, self.metrics.command_latency, decode=False, json=payload
+        )
@@ -0,0 +1,111 @@
+"""Access token handling for the Elica cloud API."""
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from homeassistant.helpers.storage import Store
+
+from .const import TOKEN_DEFAULT_LIFETIME, TOKEN_REFRESH_MARGIN, TOKEN_REFRESH_MIN_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ElicaTokenManager:
+    """Keep a valid access token, renewing it ahead of expiry.
+
+    Concurrent callers share one in-flight renewal, and the token survives
+    restarts when a store is given.
+    """
+
+    def __init__(
+        self,
+        fetch_token: Callable[[], Awaitable[tuple[str, int | None]]],
+        store: Store | None = None,
+    ) -> None:
+        self._fetch_token = fetch_token
+        self._store = store
+        self._token = None
+        self._expires_at = 0.0
+        # Renew this long before expiry; less for tokens shorter than twice the margin
+        self._margin = TOKEN_REFRESH_MARGIN
+        self._refresh_task: asyncio.Task | None = None
+        self._refresh_timer: asyncio.TimerHandle | None = None
+
+    @property
+    def token(self) -> str | None:
+        return self._token
+
+    @property
+    def expires_at(self) -> float:
+        return self._expires_at
+
+    async def async_load(self) -> None:
+        """Restore a persisted token, if it is still usable."""
+        if self._store is None:
+            return
+        data = await self._store.async_load()
+        if not data or data.get("expires_at", 0) - TOKEN_REFRESH_MARGIN <= time.time():
+            return
+        self._token = data["token"]
+        self._expires_at = data["expires_at"]
+        self._margin = TOKEN_REFRESH_MARGIN
+        self._schedule_refresh()
+
+    async def async_get_token(self) -> str:
+        """Return a token that is valid for at least the refresh margin."""
+        if self._token is not None and time.time() < self._expires_at - self._margin:
+            return self._token
+        return await self.async_refresh()
+
+    async def async_refresh(self) -> str:
+        """Renew the token, joining a renewal that is already running."""
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._async_refresh())
+        # Shield so a cancelled caller doesn't abort the renewal for the others
+        return await asyncio.shield(self._refresh_task)
+
+    async def async_set_token(self, token: str, expires_at: float) -> None:
+        """Adopt a token, e.g. one obtained during the config flow."""
+        self._token = token
+        self._expires_at = expires_at
+        self._margin = min(TOKEN_REFRESH_MARGIN, (expires_at - time.time()) / 2)
+        if self._store is not None:
+            await self._store.async_save({"token": token, "expires_at": expires_at})
+        self._schedule_refresh()
+
+    def invalidate(self, token: str) -> None:
+        """Drop token after the cloud rejected it, unless it was already renewed."""
+        if token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+    def stop(self) -> None:
+        """Cancel the scheduled proactive renewal."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+
+    async def _async_refresh(self) -> str:
+        try:
+            token, expires_in = await self._fetch_token()
+            await self.async_set_token(token, time.time() + (expires_in or TOKEN_DEFAULT_LIFETIME))
+            return token
+        finally:
+            self._refresh_task = None
+
+    def _schedule_refresh(self) -> None:
+        self.stop()
+        # Never renew back to back, even for a token that is already stale
+        delay = max(self._expires_at - self._margin - time.time(), TOKEN_REFRESH_MIN_DELAY)
+        self._refresh_timer = asyncio.get_running_loop().call_later(delay, self._proactive_refresh)
+
+    def _proactive_refresh(self) -> None:
+        self._refresh_timer = None
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._async_refresh())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.warning("Proactive token refresh failed: %s", task.exception())
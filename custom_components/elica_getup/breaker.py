@@ -0,0 +1,80 @@
+"""Circuit breaker for the Elica cloud API."""
+import random
+import time
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class ElicaCircuitBreaker:
+    """Stop calling the cloud after repeated connection failures.
+
+    Once open, requests fail immediately until the probe delay has passed;
+    then a single request is let through as a probe. A successful probe
+    closes the circuit, a failed one reopens it with twice the delay.
+    """
+
+    def __init__(self, threshold: int, probe_delay: float, probe_delay_max: float) -> None:
+        self._threshold = threshold
+        self._probe_delay = probe_delay
+        self._probe_delay_max = probe_delay_max
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._delay = probe_delay
+        self._probe_at = 0.0
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe is allowed, 0 when requests may go ahead."""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(self._probe_at - time.monotonic(), 0.0)
+
+    @property
+    def rejecting(self) -> bool:
+        """Return whether requests are currently refused without a probe."""
+        return self.state == STATE_HALF_OPEN or (self.state == STATE_OPEN and self.retry_in > 0)
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent now."""
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and time.monotonic() >= self._probe_at:
+            # Only the first caller gets to probe
+            self.state = STATE_HALF_OPEN
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._delay = self._probe_delay
+
+    def release(self) -> None:
+        """Give back a probe that ended without reaching the cloud."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+            self._probe_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._delay = min(self._delay * 2, self._probe_delay_max)
+            self._open()
+        elif self.state == STATE_CLOSED and self.failures >= self._threshold:
+            self.trips += 1
+            self._open()
+
+    def _open(self) -> None:
+        self.state = STATE_OPEN
+        self._probe_at = time.monotonic() + self._delay * random.uniform(0.8, 1.2)
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "retry_in": round(self.retry_in, 1),
+        }
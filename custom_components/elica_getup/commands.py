@@ -0,0 +1,259 @@
+"""Command delivery for Elica hoods."""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .api import ElicaApi, ElicaApiError, ElicaCircuitOpenError, ElicaConnectionError
+from .const import CLOSE_SETTLE_DELAY, OUTBOX_JITTER, OUTBOX_MAX_AGE, OUTBOX_SAVE_DELAY
+from .models import CAP_FAN_SPEED, CAP_LIGHT_LEVEL, CAP_POSITION, POSITION_DOWN, POSITION_LOWER, HoodState
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Batch:
+    """Capabilities collected for one hood during a coalescing window."""
+
+    __slots__ = ("caps", "future", "timer")
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.caps = {}
+        self.future = future
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class _Step:
+    """A command waiting for the hood to reach a prerequisite state."""
+
+    __slots__ = ("caps", "requires", "released", "timer")
+
+    def __init__(self, caps: dict, requires: dict) -> None:
+        self.caps = caps
+        self.requires = requires
+        self.released = False
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class ElicaCommandQueue:
+    """Schedule and merge capability changes per hood.
+
+    Commands can depend on a prerequisite state ("raise, then set light"):
+    they wait in a per-hood FIFO until a poll reports that state, or until
+    their timeout passes, without blocking the caller. Changes for the same
+    hood that are released within the window are merged last-write-wins;
+    every caller waits for the single resulting request.
+
+    Commands that can't reach the cloud go to a persistent per-hood outbox
+    that keeps only the latest value of each capability. After the next
+    successful poll the outbox is sent, one request per hood, and intents
+    older than OUTBOX_MAX_AGE are dropped.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: ElicaApi, window: float, store: Store | None = None) -> None:
+        self.hass = hass
+        self._api = api
+        self._window = window
+        self._store = store
+        self._batches: dict[str, _Batch] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._steps: dict[str, deque[_Step]] = {}
+        # Hood -> capability -> [value, wall time it was issued]
+        self.outbox: dict[str, dict[str, list]] = {}
+        self._outbox_timer: asyncio.TimerHandle | None = None
+
+    async def async_load(self) -> None:
+        """Restore the commands left in the outbox by a previous run."""
+        if self._store is not None:
+            self.outbox = (await self._store.async_load() or {}).get("outbox", {})
+            self._drop_stale()
+
+    async def async_submit(
+        self, device_id: str, caps: dict, requires: dict | None = None, timeout: float = 0
+    ) -> bool:
+        """Send caps once the hood reports the requires state.
+
+        Returns as soon as the command is accepted: immediately when it has
+        to wait, or after delivery when it can be sent right away. While the
+        cloud is considered down the caps go to the outbox at once. Returns
+        False when they went to the outbox instead of being sent or waiting.
+        """
+        if self._api.breaker.rejecting:
+            self._park(device_id, caps)
+            return False
+        steps = self._steps.setdefault(device_id, deque())
+        if not requires and not steps:
+            return await self.async_send(device_id, caps)
+        step = _Step(caps, requires or {})
+        step.timer = self.hass.loop.call_later(timeout, self._expire, device_id, step)
+        steps.append(step)
+        return True
+
+    @callback
+    def async_check(self, hoods: dict[str, HoodState]) -> None:
+        """Release waiting commands whose prerequisite a poll has confirmed.
+
+        A successful poll also means the cloud is back, so the outbox is
+        sent after a random delay that keeps hoods and accounts apart.
+        """
+        for device_id, caps in list(self.outbox.items()):
+            hood = hoods.get(device_id)
+            if hood is None:
+                continue
+            # Nothing left to do for values the hood already reports
+            for key in [key for key, (value, _) in caps.items() if _reached(hood, key, value)]:
+                del caps[key]
+            if not caps:
+                del self.outbox[device_id]
+                self._save_outbox()
+        if self.outbox and self._outbox_timer is None:
+            self._outbox_timer = self.hass.loop.call_later(
+                random.uniform(0, OUTBOX_JITTER), self._send_outbox
+            )
+        for device_id, steps in self._steps.items():
+            hood = hoods.get(device_id)
+            if hood is None:
+                continue
+            for step in steps:
+                if all(hood.reported.get(key) == value for key, value in step.requires.items()):
+                    step.released = True
+            self._release(device_id)
+
+    @callback
+    def async_stop(self) -> None:
+        """Drop all waiting commands; the outbox stays persisted."""
+        for batch in self._batches.values():
+            batch.timer.cancel()
+            batch.future.set_exception(ElicaApiError("Integration unloaded before the command was sent"))
+        self._batches.clear()
+        for steps in self._steps.values():
+            for step in steps:
+                step.timer.cancel()
+        self._steps.clear()
+        if self._outbox_timer is not None:
+            self._outbox_timer.cancel()
+            self._outbox_timer = None
+
+    def _park(self, device_id: str, caps: dict) -> None:
+        _LOGGER.debug("Elica cloud unreachable, keeping %s for %s", caps, device_id)
+        now = time.time()
+        pending = self.outbox.setdefault(device_id, {})
+        for key, value in caps.items():
+            # A retried value keeps its age, so it still goes stale in time
+            if key not in pending or pending[key][0] != value:
+                pending[key] = [value, now]
+        self._save_outbox()
+
+    def _drop_stale(self) -> None:
+        oldest = time.time() - OUTBOX_MAX_AGE
+        for device_id, caps in list(self.outbox.items()):
+            for key in [key for key, (_, issued) in caps.items() if issued < oldest]:
+                _LOGGER.debug("Dropping stale command %s=%s for %s", key, caps[key][0], device_id)
+                del caps[key]
+            if not caps:
+                del self.outbox[device_id]
+
+    def _save_outbox(self) -> None:
+        if self._store is not None:
+            self._store.async_delay_save(lambda: {"outbox": self.outbox}, OUTBOX_SAVE_DELAY)
+
+    def _send_outbox(self) -> None:
+        self._outbox_timer = None
+        self._drop_stale()
+        for device_id, caps in self.outbox.items():
+            self.hass.async_create_task(
+                self._async_send_outbox(device_id, {key: value for key, (value, _) in caps.items()})
+            )
+        self._save_outbox()
+
+    async def _async_send_outbox(self, device_id: str, caps: dict) -> None:
+        lower = caps.pop(CAP_POSITION, None) == POSITION_LOWER
+        try:
+            # Like the cover, lower only once light and fan are off
+            if caps and not await self.async_send(device_id, caps):
+                return
+            if lower:
+                await self.async_submit(
+                    device_id,
+                    {CAP_POSITION: POSITION_LOWER},
+                    requires={CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0},
+                    timeout=CLOSE_SETTLE_DELAY,
+                )
+                caps[CAP_POSITION] = POSITION_LOWER
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error sending queued %s to %s: %s", caps, device_id, err)
+            return
+        # Sent; keep only what was changed again in the meantime
+        pending = self.outbox.get(device_id, {})
+        for key, value in caps.items():
+            if key in pending and pending[key][0] == value:
+                del pending[key]
+        if not pending:
+            self.outbox.pop(device_id, None)
+        self._save_outbox()
+
+    def _expire(self, device_id: str, step: _Step) -> None:
+        _LOGGER.debug("Prerequisite %s not confirmed for %s, sending anyway", step.requires, device_id)
+        step.released = True
+        self._release(device_id)
+
+    def _release(self, device_id: str) -> None:
+        steps = self._steps.get(device_id)
+        while steps and steps[0].released:
+            step = steps.popleft()
+            step.timer.cancel()
+            self.hass.async_create_task(self._async_send_released(device_id, step.caps))
+
+    async def _async_send_released(self, device_id: str, caps: dict) -> None:
+        try:
+            await self.async_send(device_id, caps)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error sending %s to %s: %s", caps, device_id, err)
+
+    async def async_send(self, device_id: str, caps: dict) -> bool:
+        """Queue caps for device_id and wait until they have been sent.
+
+        Returns False when the cloud was unreachable and the caps went to the
+        outbox instead.
+        """
+        batch = self._batches.get(device_id)
+        if batch is None:
+            batch = self._batches[device_id] = _Batch(self.hass.loop.create_future())
+            batch.future.add_done_callback(_consume_exception)
+            batch.timer = self.hass.loop.call_later(self._window, self._flush, device_id)
+        batch.caps.update(caps)
+        return await asyncio.shield(batch.future)
+
+    def _flush(self, device_id: str) -> None:
+        batch = self._batches.pop(device_id)
+        self.hass.async_create_task(self._async_deliver(device_id, batch))
+
+    async def _async_deliver(self, device_id: str, batch: _Batch) -> None:
+        # One request per hood at a time, so batches reach the cloud in order
+        lock = self._locks.setdefault(device_id, asyncio.Lock())
+        async with lock:
+            try:
+                await self._api.async_send_capabilities(device_id, batch.caps)
+            except (ElicaConnectionError, ElicaCircuitOpenError):
+                self._park(device_id, batch.caps)
+                batch.future.set_result(False)
+            except Exception as err:  # pylint: disable=broad-except
+                batch.future.set_exception(err)
+            else:
+                batch.future.set_result(True)
+
+
+def _reached(hood: HoodState, key: str, value) -> bool:
+    """Return whether the hood reports the state that sending key=value leads to."""
+    if key == CAP_POSITION and value == POSITION_LOWER:
+        # A lowered hood reports POSITION_DOWN, not the value sent
+        return hood.reported.get(key) == POSITION_DOWN
+    return hood.reported.get(key) == value
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    """Mark the error as retrieved when every waiter has gone away."""
+    if not future.cancelled():
+        future.exception()
@@ -1,13 +1,14 @@
 """Config flow for Elica Getup integration."""
 import logging
-import aiohttp
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import DOMAIN, URL_TOKEN, AUTH_BASIC
+from .api import ElicaApi, ElicaApiError, ElicaAuthError
+from .const import DOMAIN, CONF_COMMAND_WINDOW, DEFAULT_COMMAND_WINDOW, DATA_FLOW_CACHE, CONF_RECORD_TRAFFIC
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,34 +25,33 @@ async def validate_input(hass: HomeAssistant, data: dict) -> dict:
     
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    username = data["username"]
-    password = data["password"]
-    app_uuid = data["app_uuid"]
-
-    # Try to authenticate
-    auth_data = {
-        'scope': 'default',
-        'grant_type': 'password',
-        'username': username,
-        'password': password,
-        'app_uuid': app_uuid
-    }
-    
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            URL_TOKEN,
-            data=auth_data,
-            headers={'Authorization': AUTH_BASIC}
-        ) as resp:
-            if resp.status != 200:
-                raise InvalidAuth
-            
-            result = await resp.json()
-            if not result.get("access_token"):
-                raise InvalidAuth
+    api = ElicaApi(
+        async_get_clientsession(hass),
+        data["username"],
+        data["password"],
+        data["app_uuid"],
+    )
+
+    # Try to authenticate, then fetch the devices so setup can reuse both
+    try:
+        await api.async_authenticate()
+        try:
+            devices = await api.async_get_devices()
+        except ElicaApiError as err:
+            _LOGGER.debug("Could not fetch devices during setup: %s", err)
+            devices = None
+    except ElicaAuthError as err:
+        raise InvalidAuth from err
+    finally:
+        api.tokens.stop()
 
     # Return info that you want to store in the config entry.
-    return {"title": "Elica Getup"}
+    return {
+        "title": "Elica Getup",
+        "token": api.tokens.token,
+        "expires_at": api.tokens.expires_at,
+        "devices": devices,
+    }
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -75,6 +75,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 # Create a unique ID based on username to prevent duplicates
                 await self.async_set_unique_id(user_input["username"])
                 self._abort_if_unique_id_configured()
+
+                # Hand the token and devices over to async_setup_entry
+                self.hass.data.setdefault(DATA_FLOW_CACHE, {})[user_input["username"]] = {
+                    "token": info["token"],
+                    "expires_at": info["expires_at"],
+                    "devices": info["devices"],
+                }
                 
                 return self.async_create_entry(title=info["title"], data=user_input)
 
@@ -84,6 +91,39 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors
         )
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlow(config_entry)
+
+
+class OptionsFlow(config_entries.OptionsFlow):
+    """Handle Elica Getup options."""
+
+    def __init__(self, config_entry) -> None:
+        self._entry = config_entry
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema({
+                vol.Optional(
+                    CONF_COMMAND_WINDOW,
+                    default=options.get(CONF_COMMAND_WINDOW, DEFAULT_COMMAND_WINDOW),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+                vol.Optional(
+                    CONF_RECORD_TRAFFIC,
+                    default=options.get(CONF_RECORD_TRAFFIC, False),
+                ): bool,
+            }),
+        )
+
 
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
@@ -5,4 +5,43 @@ URL_PRESETS_START = "https://cloudprod.elica.com/eiot-api/v1/presets/start"
 # These are public client credentials for the Elica Connect API
 _A = "ZWlvdC1hcHA6"
 _B = "VnF3RzFLVEI3N1VlUk91"
-AUTH_BASIC = f"Basic {_A}{_B}"
\ No newline at end of file
+AUTH_BASIC = f"Basic {_A}{_B}"
+UPDATE_INTERVAL = 60
+ORDERED_NAMED_FAN_SPEEDS = ["1", "2", "3", "Boost 1", "Boost 2"]
+SPEED_TO_CAPS = {"1": {"64": 1, "110": 1}, "2": {"64": 1, "110": 2}, "3": {"64": 1, "110": 3}, "Boost 1": {"64": 4}, "Boost 2": {"64": 8}}
+TOKEN_REFRESH_MARGIN = 300
+TOKEN_DEFAULT_LIFETIME = 3600
+TOKEN_REFRESH_MIN_DELAY = 30
+STORAGE_VERSION = 1
+CONF_COMMAND_WINDOW = "command_window"
+DEFAULT_COMMAND_WINDOW = 250
+HOOD_TRAVEL_TIME = 28
+CLOSE_SETTLE_DELAY = 1.5
+POLL_INTERVAL_BURST = 5
+POLL_INTERVAL_IDLE = 300
+POLL_BURST_DURATION = 30
+POLL_BACKOFF_MAX = 900
+SNAPSHOT_SAVE_DELAY = 10
+DATA_FLOW_CACHE = f"{DOMAIN}_flow_cache"
+PENDING_COMMAND_TTL = 60
+RATE_LIMIT_PER_MINUTE = 30
+RATE_LIMIT_BURST = 10
+RATE_LIMIT_RESERVE = 3
+TIMEOUT_TOKEN = 15
+TIMEOUT_POLL = 20
+TIMEOUT_COMMAND = 10
+BREAKER_THRESHOLD = 3
+BREAKER_PROBE_DELAY = 30
+BREAKER_PROBE_DELAY_MAX = 600
+CONF_RECORD_TRAFFIC = "record_traffic"
+TRAFFIC_RECORD_LIMIT = 500
+TRAFFIC_SAVE_DELAY = 30
+DEFAULT_PROFILE_THRESHOLD = 100
+PROFILE_LAG_INTERVAL = 0.5
+PROFILE_BLOCKING_LIMIT = 50
+OUTBOX_MAX_AGE = 300
+OUTBOX_JITTER = 5
+OUTBOX_SAVE_DELAY = 1
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+MAX_CONCURRENT_REQUESTS = 4
+TRANSITION_STEP_BUDGET = 8
@@ -0,0 +1,190 @@
+"""Data update coordinator for the Elica Getup integration."""
+import logging
+import random
+import time
+from datetime import timedelta
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import ElicaApi, ElicaApiError, ElicaRateLimitedError
+from .breaker import STATE_OPEN
+from .commands import ElicaCommandQueue
+from .const import (
+    DOMAIN,
+    UPDATE_INTERVAL,
+    POLL_INTERVAL_BURST,
+    POLL_INTERVAL_IDLE,
+    POLL_BURST_DURATION,
+    POLL_BACKOFF_MAX,
+    PENDING_COMMAND_TTL,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .models import HoodState, decode_device
+from .scheduler import ElicaScheduler
+from .transitions import ElicaTransitions
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ElicaCoordinator(DataUpdateCoordinator):
+    """Poll the Elica cloud once and push the result to every entity of the entry."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        api: ElicaApi,
+        commands: ElicaCommandQueue,
+        scheduler: ElicaScheduler,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=UPDATE_INTERVAL),
+        )
+        self.entry = entry
+        self.api = api
+        self.commands = commands
+        self.scheduler = scheduler
+        self.transitions = ElicaTransitions(hass)
+        self.device_name = entry.data.get("device_name", "Elica Getup")
+        self.hoods: dict[str, HoodState] = {}
+        self._burst_until = 0.0
+        self._failures = 0
+        # Set when a poll found the device list unchanged, to skip notifying
+        self._unchanged = False
+        # Called after every poll, changed or not, e.g. by the metric sensors
+        self._poll_listeners: list[CALLBACK_TYPE] = []
+        self._snapshot = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.snapshot")
+
+    async def _async_update_data(self):
+        """Fetch the device list from the Elica cloud."""
+        self._unchanged = False
+        # Optimistic values expire on a processed poll, so poll in full while any are shown
+        conditional = bool(self.hoods) and not any(hood.pending for hood in self.hoods.values())
+        try:
+            devices = await self.api.async_get_devices(conditional)
+        except ElicaRateLimitedError as err:
+            # Not a cloud failure: keep the current state and try again later
+            _LOGGER.debug("%s", err)
+            for hood in self.hoods.values():
+                hood.changed = frozenset()
+            self._unchanged = self.last_update_success
+            return self.hoods
+        except ElicaApiError as err:
+            self._failures += 1
+            self.update_interval = self._next_interval()
+            raise UpdateFailed(str(err)) from err
+        self._failures = 0
+
+        if devices is None:
+            # Unchanged: nothing to normalize, but waiting commands and the
+            # outbox still learn that the cloud answered
+            for hood in self.hoods.values():
+                hood.changed = frozenset()
+            self.commands.async_check(self.hoods)
+            # Entities only need to hear about it if they were unavailable
+            self._unchanged = self.last_update_success
+        else:
+            with self.api.profiler.span("normalize", sync=True):
+                self._process_devices(devices)
+        self.update_interval = self._next_interval()
+        return self.hoods
+
+    @callback
+    def async_add_poll_listener(self, update_callback: CALLBACK_TYPE) -> CALLBACK_TYPE:
+        """Call update_callback after every poll, including unchanged ones."""
+        self._poll_listeners.append(update_callback)
+        return lambda: self._poll_listeners.remove(update_callback)
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        # The base class stops notifying listeners after the second failed
+        # poll in a row, but the metrics keep changing during an outage
+        await super()._async_refresh(*args, **kwargs)
+        for update_callback in list(self._poll_listeners):
+            update_callback()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the entities, unless the last poll changed nothing."""
+        if self._unchanged:
+            self._unchanged = False
+            return
+        super().async_update_listeners()
+
+    async def async_restore(self) -> bool:
+        """Load the hoods persisted by a previous run; return whether there were any."""
+        data = await self._snapshot.async_load()
+        if not data or not data.get("hoods"):
+            return False
+        for item in data["hoods"]:
+            hood = HoodState.from_dict(item)
+            self.hoods[hood.device_id] = hood
+        self.async_set_updated_data(self.hoods)
+        return True
+
+    @callback
+    def async_set_devices(self, devices: list) -> None:
+        """Use a device list fetched elsewhere, e.g. by the config flow."""
+        self._process_devices(devices)
+        self.async_set_updated_data(self.hoods)
+
+    @callback
+    def async_set_pending(self, device_id: str, caps: dict) -> None:
+        """Show command values on a hood's entities until a poll confirms them."""
+        for hood in self.hoods.values():
+            hood.changed = frozenset()
+        self.hoods[device_id].set_pending(caps, PENDING_COMMAND_TTL)
+        self.async_update_listeners()
+
+    def _process_devices(self, devices: list) -> None:
+        """Update the per-device store, remembering what changed."""
+        for hood in self.hoods.values():
+            hood.changed = frozenset()
+        changed = False
+        for device in devices:
+            device_id, values = decode_device(device)
+            hood = self.hoods.get(device_id)
+            if hood is None:
+                hood = self.hoods[device_id] = HoodState(device_id)
+                changed = True
+            if hood.update_decoded(values):
+                changed = True
+
+        self.commands.async_check(self.hoods)
+        if changed:
+            self._snapshot.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    def _snapshot_data(self) -> dict:
+        return {"hoods": [hood.as_dict() for hood in self.hoods.values()]}
+
+    @callback
+    def async_note_command(self, duration: float = POLL_BURST_DURATION) -> None:
+        """Poll in short bursts for duration seconds, e.g. while a hood moves."""
+        self._burst_until = max(self._burst_until, time.monotonic() + duration)
+        burst = timedelta(seconds=POLL_INTERVAL_BURST)
+        if self.update_interval != burst and not self._failures:
+            self.update_interval = burst
+            self._schedule_refresh()
+
+    def _next_interval(self) -> timedelta:
+        """Pick the poll interval from the cloud health and hood activity."""
+        if self.api.breaker.state == STATE_OPEN:
+            # Poll again exactly when the breaker lets the next probe through
+            return timedelta(seconds=max(self.api.breaker.retry_in, 1))
+        if self._failures:
+            # Exponential backoff with jitter so retries don't line up
+            delay = min(UPDATE_INTERVAL * 2 ** min(self._failures, 8), POLL_BACKOFF_MAX)
+            return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+        if time.monotonic() < self._burst_until:
+            return timedelta(seconds=POLL_INTERVAL_BURST)
+        if any(hood.is_up or hood.fan_on or hood.light_on for hood in self.hoods.values()):
+            interval = UPDATE_INTERVAL
+        else:
+            interval = POLL_INTERVAL_IDLE
+        # Regular polls land in this account's slot, apart from the others
+        return timedelta(seconds=self.scheduler.next_poll(self.entry.entry_id, interval))
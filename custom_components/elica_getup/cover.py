@@ -1,86 +1,150 @@
-import aiohttp
-import asyncio
 import logging
+import time
+from datetime import timedelta
 from homeassistant.components.cover import CoverEntity, CoverEntityFeature, CoverDeviceClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from .const import DOMAIN, URL_DEVICES
+from .api import ElicaApiError
+from .const import DOMAIN, HOOD_TRAVEL_TIME, POLL_INTERVAL_BURST, CLOSE_SETTLE_DELAY
+from .entity import ElicaEntity
+from .models import CAP_FAN_SPEED, CAP_LIGHT_LEVEL, CAP_POSITION, POSITION_DOWN, POSITION_LOWER, POSITION_UP
 
 _LOGGER = logging.getLogger(__name__)
 
+POSITION_UPDATE_INTERVAL = 2
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Elica Getup cover from a config entry."""
-    entry_data = hass.data[DOMAIN][entry.entry_id]
-    devices = entry_data.get("devices", [])
-    async_add_entities([ElicaCover(hass, device, entry.entry_id) for device in devices], True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities([ElicaCover(coordinator, hood) for hood in coordinator.data.values()])
+
+class CoverMotion:
+    """Time-based estimate of a hood travelling between down (0) and up (100)."""
+
+    __slots__ = ("start", "target", "started_at", "duration")
+
+    def __init__(self, start: int, target: int, now: float) -> None:
+        self.start = start
+        self.target = target
+        self.started_at = now
+        self.duration = HOOD_TRAVEL_TIME * abs(target - start) / 100
 
-class ElicaCover(CoverEntity):
-    _attr_has_entity_name = True
+    def position(self, now: float) -> int:
+        if self.duration <= 0:
+            return self.target
+        fraction = min((now - self.started_at) / self.duration, 1)
+        return round(self.start + (self.target - self.start) * fraction)
+
+
+class ElicaCover(ElicaEntity, CoverEntity):
     _attr_translation_key = "position"
+    _inputs = frozenset({CAP_POSITION})
 
-    def __init__(self, hass, device, entry_id):
-        self.hass = hass
-        self._entry_id = entry_id
-        self._device_id = device["id"]
+    def __init__(self, coordinator, hood):
+        super().__init__(coordinator, hood)
         self._attr_unique_id = f"{self._device_id}_cover"
         self._attr_device_class = CoverDeviceClass.SHADE
+        # The cloud only takes "up" or "down" for capability 53, so there is
+        # no SET_POSITION or STOP; the position is estimated from travel time
         self._attr_supported_features = CoverEntityFeature.OPEN | CoverEntityFeature.CLOSE
-        self._app_uuid = hass.data[DOMAIN][entry_id]["app_uuid"]
-        self._is_moving_to = None
+        self._motion: CoverMotion | None = None
+        self._move_unsubs = []
 
     @property
-    def device_info(self):
-        device_name = self.hass.data[DOMAIN][self._entry_id].get("device_name", "Elica Getup")
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": device_name,
-            "manufacturer": "Elica",
-            "model": "GetUp"
-        }
+    def current_cover_position(self):
+        if self._motion is not None:
+            return self._motion.position(time.monotonic())
+        return 100 if self._hood.is_up else 0
 
     @property
-    def is_opening(self): return self._is_moving_to == "open"
+    def is_opening(self): return self._motion is not None and self._motion.target == 100
     @property
-    def is_closing(self): return self._is_moving_to == "closed"
+    def is_closing(self): return self._motion is not None and self._motion.target == 0
 
     @property
     def is_closed(self):
-        if self._is_moving_to == "closed": return False
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: return int(d.get("53", 1)) != 1
-        return False
+        if self._motion is not None: return False
+        return not self._hood.is_up
+
+    async def async_will_remove_from_hass(self) -> None:
+        self._cancel_move()
+        await super().async_will_remove_from_hass()
 
     async def async_open_cover(self, **kwargs):
-        self._is_moving_to = "open"
-        self.async_write_ha_state()
-        await self._send_capabilities({"53": 1})
-        await asyncio.sleep(28)
-        self._is_moving_to = None
-        self._update_local_state({"53": 1})
+        self._start_move(100, {CAP_POSITION: POSITION_UP})
+        try:
+            await self._send_capabilities({CAP_POSITION: POSITION_UP})
+        except ElicaApiError:
+            self._abort_move()
+            raise
 
     async def async_close_cover(self, **kwargs):
-        self._is_moving_to = "closed"
+        self._start_move(0, {CAP_POSITION: POSITION_DOWN, CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0})
+        try:
+            await self._send_capabilities({CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0})
+        except ElicaApiError:
+            self._abort_move()
+            raise
+        # Lower only once light and fan are off; the short timeout gives the
+        # server time to process the first command when no poll confirms it
+        await self._send_capabilities(
+            {CAP_POSITION: POSITION_LOWER},
+            requires={CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0},
+            timeout=CLOSE_SETTLE_DELAY,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Finish early once a poll reports the hood at its destination
+        if self._motion is not None:
+            settled = POSITION_UP if self._motion.target == 100 else POSITION_DOWN
+            if self._hood.reported[CAP_POSITION] == settled:
+                self._cancel_move()
+                self.async_write_ha_state()
+                return
+        super()._handle_coordinator_update()
+
+    def _start_move(self, target, final_caps):
+        """Track the hood as moving until a poll or its travel time ends the move."""
+        start = self.current_cover_position
+        self._cancel_move()
+        if start == target:
+            self.async_write_ha_state()
+            return
+        self._motion = CoverMotion(start, target, time.monotonic())
         self.async_write_ha_state()
-        await self._send_capabilities({"96": 0, "110": 0})
-        await asyncio.sleep(1.5)
-        await self._send_capabilities({"53": 0})
-        await asyncio.sleep(28)
-        self._is_moving_to = None
-        self._update_local_state({"53": 4, "96": 0, "110": 0})
-
-    def _update_local_state(self, caps):
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: d.update(caps)
+
+        @callback
+        def _finish_move(_now):
+            # No poll confirmed the move in time; assume it completed
+            self._cancel_move()
+            self._update_local_state(final_caps)
+            self.async_write_ha_state()
+
+        @callback
+        def _update_position(_now):
+            self.async_write_ha_state()
+
+        self._move_unsubs = [
+            async_call_later(self.hass, self._motion.duration + POLL_INTERVAL_BURST, _finish_move),
+            async_track_time_interval(self.hass, _update_position, timedelta(seconds=POSITION_UPDATE_INTERVAL)),
+        ]
+        # Keep polling quickly while the hood travels
+        self.coordinator.async_note_command(self._motion.duration + POLL_INTERVAL_BURST)
+
+    def _abort_move(self):
+        """Stop showing a move whose command the cloud rejected."""
+        self._cancel_move()
         self.async_write_ha_state()
 
-    async def _send_capabilities(self, cap_dict):
-        token = self.hass.data[DOMAIN][self._entry_id].get("token")
-        payload = {"type": "Hood", "name": "capabilities", "async": True, "capabilities": cap_dict}
-        headers = {'Authorization': f'Bearer {token}', 'App-Uuid': self._app_uuid}
-        async with aiohttp.ClientSession() as session:
-            await session.post(f"{URL_DEVICES}/{self._device_id}/commands", json=payload, headers=headers)
\ No newline at end of file
+    def _cancel_move(self):
+        self._motion = None
+        for unsub in self._move_unsubs:
+            unsub()
+        self._move_unsubs = []
\ No newline at end of file
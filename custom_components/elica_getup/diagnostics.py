@@ -0,0 +1,39 @@
+"""Diagnostics support for the Elica Getup integration."""
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .api import ElicaApiError
+from .const import DOMAIN
+
+TO_REDACT = {"username", "password", "app_uuid"}
+# Identifying fields of raw cloud devices
+DEVICE_TO_REDACT = {"serialNumber", "mac", "macAddress", "ssid", "ip", "email"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    recorder = hass.data[DOMAIN][entry.entry_id]["recorder"]
+    # Only the decoded values are kept, so fetch the raw payload on demand
+    try:
+        devices = async_redact_data(await coordinator.api.async_get_raw_devices(), DEVICE_TO_REDACT)
+    except ElicaApiError as err:
+        devices = {"error": str(err)}
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "update_interval": coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        },
+        "metrics": coordinator.api.metrics.as_dict(),
+        "circuit": coordinator.api.breaker.as_dict(),
+        "profile": coordinator.api.profiler.as_dict(),
+        "hoods": [hood.as_dict() for hood in coordinator.hoods.values()],
+        "devices": devices,
+        "outbox": coordinator.commands.outbox,
+        "traffic": recorder.as_dict() if recorder else None,
+    }
@@ -0,0 +1,75 @@
+"""Base entity for the Elica Getup integration."""
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import ElicaCoordinator
+from .models import HoodState
+
+
+class ElicaEntity(CoordinatorEntity[ElicaCoordinator]):
+    """Common base for all entities of an Elica hood."""
+
+    _attr_has_entity_name = True
+    # Hood inputs (capability codes or filter names) the state depends on;
+    # None writes state on every coordinator update
+    _inputs: frozenset | None = None
+
+    def __init__(self, coordinator: ElicaCoordinator, hood: HoodState) -> None:
+        super().__init__(coordinator)
+        self._hood = hood
+        self._device_id = hood.device_id
+        self._was_available = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # The state is written right after this, so start diffing from it
+        self._was_available = self.available
+
+    @property
+    def device_info(self):
+        return {
+            "identifiers": {(DOMAIN, self._device_id)},
+            "name": self.coordinator.device_name,
+            "manufacturer": "Elica",
+            "model": "GetUp"
+        }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when availability or one of our inputs changed."""
+        available = self.available
+        if (
+            self._inputs is None
+            or available != self._was_available
+            or not self._inputs.isdisjoint(self._hood.changed)
+        ):
+            self._was_available = available
+            self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        with self.coordinator.api.profiler.span("state_write", sync=True):
+            super().async_write_ha_state()
+
+    def _update_local_state(self, caps):
+        self.coordinator.async_set_pending(self._device_id, caps)
+
+    async def _send_capabilities(self, cap_dict, requires=None, timeout=0):
+        # A new command wins over a transition still fading the same values
+        self.coordinator.transitions.async_cancel(self._device_id, cap_dict)
+        with self.coordinator.api.profiler.span("send_capabilities"):
+            await self.coordinator.commands.async_submit(self._device_id, cap_dict, requires, timeout)
+        self.coordinator.async_note_command()
+
+    def _start_transition(self, steps):
+        """Send the (offset, capabilities) steps as a transition."""
+
+        async def _send_step(caps):
+            with self.coordinator.api.profiler.span("send_capabilities"):
+                await self.coordinator.commands.async_send(self._device_id, caps)
+            # Each step replaces the previous one as the value shown
+            self._update_local_state(caps)
+            self.coordinator.async_note_command()
+
+        self.coordinator.transitions.async_start(self._device_id, steps, _send_step)
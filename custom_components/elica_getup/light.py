@@ -1,11 +1,11 @@
-import aiohttp
-import asyncio
 import logging
-from homeassistant.components.light import LightEntity, ColorMode
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_TRANSITION, ColorMode, LightEntity, LightEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from .const import DOMAIN, URL_DEVICES
+from .const import DOMAIN, HOOD_TRAVEL_TIME
+from .entity import ElicaEntity
+from .models import CAP_LIGHT_LEVEL, CAP_LIGHT_MODE, CAP_POSITION, POSITION_UP
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -15,72 +15,63 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Elica Getup light from a config entry."""
-    entry_data = hass.data[DOMAIN][entry.entry_id]
-    devices = entry_data.get("devices", [])
-    async_add_entities([ElicaLight(hass, device, entry.entry_id) for device in devices], True)
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    async_add_entities([ElicaLight(coordinator, hood) for hood in coordinator.data.values()])
 
-class ElicaLight(LightEntity):
-    _attr_has_entity_name = True
+class ElicaLight(ElicaEntity, LightEntity):
     _attr_translation_key = "light"
+    _inputs = frozenset({CAP_LIGHT_LEVEL})
 
-    def __init__(self, hass, device, entry_id):
-        self.hass = hass
-        self._entry_id = entry_id
-        self._device_id = device["id"]
+    def __init__(self, coordinator, hood):
+        super().__init__(coordinator, hood)
         self._attr_unique_id = f"{self._device_id}_light"
         self._attr_color_mode = ColorMode.BRIGHTNESS
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
-        self._app_uuid = hass.data[DOMAIN][entry_id]["app_uuid"]
-
-    @property
-    def device_info(self):
-        device_name = self.hass.data[DOMAIN][self._entry_id].get("device_name", "Elica Getup")
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": device_name,
-            "manufacturer": "Elica",
-            "model": "GetUp",
-        }
+        self._attr_supported_features = LightEntityFeature.TRANSITION
 
     @property
     def is_on(self):
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: return float(d.get("96", 0)) > 0
-        return False
+        return self._hood.light_on
 
     @property
     def brightness(self):
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: return int(float(d.get("96", 0)) * 2.55)
-        return 0
+        return self._hood.brightness
 
     async def async_turn_on(self, **kwargs):
-        pos = 1
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: pos = int(d.get("53", 1))
-        
-        if pos != 1:
-            await self._send_capabilities({"53": 1})
-            self._update_local_state({"53": 1})
-            await asyncio.sleep(28)
-
-        brightness = kwargs.get("brightness", self.brightness if self.brightness > 0 else 255)
+        brightness = kwargs.get(ATTR_BRIGHTNESS, self.brightness if self.brightness > 0 else 255)
         level = int(brightness / 2.55)
-        await self._send_capabilities({"96": level, "71": 1})
-        self._update_local_state({"96": level, "71": 1})
 
-    async def async_turn_off(self, **kwargs):
-        await self._send_capabilities({"96": 0})
-        self._update_local_state({"96": 0})
+        if kwargs.get(ATTR_TRANSITION) and self._hood.is_up:
+            self._fade(level, kwargs[ATTR_TRANSITION])
+            return
+        if not self._hood.is_up:
+            await self._send_capabilities({CAP_POSITION: POSITION_UP})
+            self._update_local_state({CAP_POSITION: POSITION_UP})
+            # Light up once a poll reports the hood raised, without blocking the call
+            await self._send_capabilities(
+                {CAP_LIGHT_LEVEL: level, CAP_LIGHT_MODE: 1},
+                requires={CAP_POSITION: POSITION_UP},
+                timeout=HOOD_TRAVEL_TIME,
+            )
+        else:
+            await self._send_capabilities({CAP_LIGHT_LEVEL: level, CAP_LIGHT_MODE: 1})
+        self._update_local_state({CAP_LIGHT_LEVEL: level, CAP_LIGHT_MODE: 1})
 
-    def _update_local_state(self, caps):
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: d.update(caps)
-        self.async_write_ha_state()
+    async def async_turn_off(self, **kwargs):
+        if kwargs.get(ATTR_TRANSITION) and self._hood.light_on:
+            self._fade(0, kwargs[ATTR_TRANSITION])
+            return
+        await self._send_capabilities({CAP_LIGHT_LEVEL: 0})
+        self._update_local_state({CAP_LIGHT_LEVEL: 0})
 
-    async def _send_capabilities(self, cap_dict):
-        token = self.hass.data[DOMAIN][self._entry_id].get("token")
-        payload = {"type": "Hood", "name": "capabilities", "async": True, "capabilities": cap_dict}
-        headers = {'Authorization': f'Bearer {token}', 'App-Uuid': self._app_uuid}
-        async with aiohttp.ClientSession() as session:
-            await session.post(f"{URL_DEVICES}/{self._device_id}/commands", json=payload, headers=headers)
\ No newline at end of file
+    def _fade(self, level, duration):
+        """Move the light level to level over duration seconds."""
+        # Stop a running fade first, so it doesn't take a share of the budget
+        self.coordinator.transitions.async_cancel(self._device_id, {CAP_LIGHT_LEVEL})
+        steps = self.coordinator.transitions.plan(self._hood.caps[CAP_LIGHT_LEVEL], level, duration)
+        self._start_transition(
+            [
+                (offset, {CAP_LIGHT_LEVEL: value, CAP_LIGHT_MODE: 1} if value else {CAP_LIGHT_LEVEL: 0})
+                for offset, value in steps
+            ]
+        )
\ No newline at end of file
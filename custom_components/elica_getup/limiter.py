@@ -0,0 +1,84 @@
+"""Request rate limiting for one Elica account."""
+import asyncio
+import heapq
+import itertools
+import time
+
+# Lower values are served first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+PRIORITY_DIAGNOSTIC = 2
+
+
+class ElicaRateLimiter:
+    """Token bucket shared by all requests of an account.
+
+    Commands wait for a token in priority order. Background requests never
+    wait: they only go ahead while more than the reserve is left, so a busy
+    moment is spent on user commands instead of polls.
+    """
+
+    def __init__(self, rate: float, burst: int, reserve: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._reserve = reserve
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: asyncio.TimerHandle | None = None
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def try_acquire(self, priority: int) -> bool:
+        """Take a token for a background request if the budget allows it."""
+        self._refill()
+        if self._waiters or self._tokens < 1 + self._reserve * priority:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def async_acquire(self, priority: int = PRIORITY_COMMAND) -> None:
+        """Wait for a token, served in priority order."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule_wakeup()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was granted just before the caller went away
+                self._tokens += 1
+            raise
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _schedule_wakeup(self) -> None:
+        if self._wakeup is None:
+            delay = max((1 - self._tokens) / self._rate, 0)
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._wake)
+
+    def _wake(self) -> None:
+        self._wakeup = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        # Drop waiters that were cancelled while queued
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            self._schedule_wakeup()
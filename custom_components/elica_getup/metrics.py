@@ -0,0 +1,64 @@
+"""Cloud API instrumentation for the Elica Getup integration."""
+from datetime import datetime
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram."""
+
+    __slots__ = ("counts", "count", "total", "last")
+
+    def __init__(self) -> None:
+        # One extra bucket for values above the last bound
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+
+    def observe(self, seconds: float) -> None:
+        for idx, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                break
+        else:
+            idx = len(LATENCY_BUCKETS)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict:
+        buckets = {f"le_{bound}": n for bound, n in zip(LATENCY_BUCKETS, self.counts)}
+        buckets["inf"] = self.counts[-1]
+        return {"count": self.count, "mean": self.mean, "last": self.last, "buckets": buckets}
+
+
+class ElicaMetrics:
+    """Counters and latencies of one account's requests to the Elica cloud."""
+
+    def __init__(self) -> None:
+        self.poll_latency = LatencyHistogram()
+        self.command_latency = LatencyHistogram()
+        self.successes = 0
+        self.failures = 0
+        self.unauthorized = 0
+        self.token_refreshes = 0
+        self.unchanged_polls = 0
+        self.last_poll_success: datetime | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "poll_latency": self.poll_latency.as_dict(),
+            "command_latency": self.command_latency.as_dict(),
+            "successes": self.successes,
+            "failures": self.failures,
+            "unauthorized": self.unauthorized,
+            "token_refreshes": self.token_refreshes,
+            "unchanged_polls": self.unchanged_polls,
+            "last_poll_success": self.last_poll_success.isoformat() if self.last_poll_success else None,
+        }
@@ -0,0 +1,204 @@
+"""Typed hood state for the Elica Getup integration."""
+import math
+import time
+from typing import NamedTuple
+
+from .const import ORDERED_NAMED_FAN_SPEEDS
+
+# Capability codes used by the Elica cloud
+CAP_FAN_MODE = "64"
+CAP_LIGHT_MODE = "71"
+CAP_LIGHT_LEVEL = "96"
+CAP_FAN_SPEED = "110"
+CAP_POSITION = "53"
+CAPABILITIES = (CAP_FAN_MODE, CAP_LIGHT_MODE, CAP_LIGHT_LEVEL, CAP_FAN_SPEED, CAP_POSITION)
+
+POSITION_UP = 1
+POSITION_DOWN = 4
+# Sent to lower the hood, which then reports POSITION_DOWN
+POSITION_LOWER = 0
+
+SECTION_DATA_MODEL = "dataModel"
+SECTION_FILTERS = "filters"
+
+
+class SchemaField(NamedTuple):
+    """A hood value the platforms read, and where a cloud device has it."""
+
+    name: str
+    section: str
+    key: str
+
+
+# Everything kept from a cloud device, in the order of decode_device() values
+DEVICE_SCHEMA = (
+    *(SchemaField(code, SECTION_DATA_MODEL, code) for code in CAPABILITIES),
+    SchemaField("filter_grease", SECTION_FILTERS, "grease"),
+    SchemaField("filter_charcoal", SECTION_FILTERS, "charcoal"),
+)
+
+
+class HoodState:
+    """State of one hood, with the values the entities read precomputed.
+
+    caps holds what the entities show: the values last reported by the cloud
+    (reported) overlaid with optimistic command values (pending) that no poll
+    has confirmed yet.
+    """
+
+    __slots__ = (
+        "device_id",
+        "caps",
+        "reported",
+        "pending",
+        "filter_grease",
+        "filter_charcoal",
+        "fan_on",
+        "preset_mode",
+        "percentage",
+        "light_on",
+        "brightness",
+        "is_up",
+        "changed",
+        "decoded",
+    )
+
+    def __init__(self, device_id: str) -> None:
+        self.device_id = device_id
+        self.reported = dict.fromkeys(CAPABILITIES, 0)
+        self.reported[CAP_POSITION] = POSITION_UP
+        self.caps = dict(self.reported)
+        # Capability -> (value, monotonic expiry) of unconfirmed commands
+        self.pending: dict[str, tuple[int, float]] = {}
+        self.filter_grease = 0.0
+        self.filter_charcoal = 0.0
+        self.changed = frozenset()
+        # Last decode_device() values, to skip identical polls
+        self.decoded: tuple | None = None
+        self._derive()
+
+    def update_decoded(self, values: tuple) -> frozenset:
+        """Merge decode_device() values, doing nothing when they are unchanged."""
+        if values == self.decoded and not self.pending:
+            self.changed = frozenset()
+            return self.changed
+        self.decoded = values
+        caps, filters = {}, {}
+        for field, value in zip(DEVICE_SCHEMA, values):
+            if value is not None:
+                (caps if field.section == SECTION_DATA_MODEL else filters)[field.name] = value
+        return self.update(caps, filters)
+
+    def update(self, caps: dict, filters: dict | None = None) -> frozenset:
+        """Merge values reported by the cloud and recompute the derived fields.
+
+        A pending command value is kept until the cloud reports it or its TTL
+        passes, so a poll that was already in flight can't revert it.
+        Returns the names of the inputs whose value changed, which are also
+        kept in changed until the next update.
+        """
+        self.reported.update(caps)
+        now = time.monotonic()
+        for key, (value, expires) in list(self.pending.items()):
+            if self.reported.get(key) == value or expires <= now:
+                del self.pending[key]
+        return self._apply(filters)
+
+    def set_pending(self, caps: dict, ttl: float) -> frozenset:
+        """Show command values until a poll confirms them or ttl seconds pass."""
+        expires = time.monotonic() + ttl
+        for key, value in caps.items():
+            self.pending[key] = (value, expires)
+        return self._apply(None)
+
+    def _apply(self, filters: dict | None) -> frozenset:
+        caps = dict(self.reported)
+        for key, (value, _) in self.pending.items():
+            caps[key] = value
+        changed = {key for key, value in caps.items() if self.caps.get(key) != value}
+        if changed:
+            self.caps = caps
+        if filters:
+            for name in ("filter_grease", "filter_charcoal"):
+                if name in filters and filters[name] != getattr(self, name):
+                    setattr(self, name, filters[name])
+                    changed.add(name)
+        self.changed = frozenset(changed)
+        if changed:
+            self._derive()
+        return self.changed
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HoodState":
+        """Rebuild a hood from as_dict() output."""
+        hood = cls(data["device_id"])
+        hood.update(data["caps"], data)
+        hood.changed = frozenset()
+        return hood
+
+    def as_dict(self) -> dict:
+        return {
+            "device_id": self.device_id,
+            "caps": dict(self.reported),
+            "filter_grease": self.filter_grease,
+            "filter_charcoal": self.filter_charcoal,
+        }
+
+    def _derive(self) -> None:
+        caps = self.caps
+        m64, m110 = caps[CAP_FAN_MODE], caps[CAP_FAN_SPEED]
+        self.fan_on = m110 > 0 or m64 > 1
+        if m64 == 8:
+            self.preset_mode = "Boost 2"
+        elif m64 == 4:
+            self.preset_mode = "Boost 1"
+        elif m64 == 1 and m110 in (1, 2, 3):
+            self.preset_mode = str(m110)
+        else:
+            self.preset_mode = None
+        if self.preset_mode is None:
+            self.percentage = 0
+        else:
+            idx = ORDERED_NAMED_FAN_SPEEDS.index(self.preset_mode)
+            self.percentage = int((idx + 1) * 100 / len(ORDERED_NAMED_FAN_SPEEDS))
+        level = caps[CAP_LIGHT_LEVEL]
+        self.light_on = level > 0
+        self.brightness = int(level * 2.55)
+        self.is_up = caps[CAP_POSITION] == POSITION_UP
+
+
+def decode_device(device: dict) -> tuple[str, tuple]:
+    """Reduce a raw cloud device to its id and compact DEVICE_SCHEMA values.
+
+    Capabilities are ints and filter efficiencies floats, or None when the
+    device doesn't report them.
+    """
+    sections = {
+        SECTION_DATA_MODEL: device.get("dataModel") or {},
+        SECTION_FILTERS: {f.get("type"): f.get("efficiency", 0) for f in device.get("filters") or ()},
+    }
+    return device["id"], tuple(
+        _CONVERTERS[field.section](sections[field.section].get(field.key)) for field in DEVICE_SCHEMA
+    )
+
+
+def _to_int(value) -> int | None:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_float(value) -> float | None:
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+_CONVERTERS = {SECTION_DATA_MODEL: _to_int, SECTION_FILTERS: _to_float}
@@ -0,0 +1,129 @@
+"""Debug profiling of where the integration spends its time."""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+
+from homeassistant.util import dt as dt_util
+
+from .const import PROFILE_BLOCKING_LIMIT, PROFILE_LAG_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class PhaseStats:
+    """Timings of one profiled phase."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.count, 3) if self.count else None,
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class ElicaProfiler:
+    """Per-phase timing spans and event loop blocking detection.
+
+    Disabled by default; spans are then a shared no-op context manager.
+    While enabled, synchronous spans longer than the threshold and event
+    loop stalls seen by a heartbeat are recorded as blocking events.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.threshold = 0.0
+        self.started: str | None = None
+        self.phases: dict[str, PhaseStats] = {}
+        self.blocking: deque[dict] = deque(maxlen=PROFILE_BLOCKING_LIMIT)
+        self._heartbeat: asyncio.TimerHandle | None = None
+        self._expected = 0.0
+
+    def start(self, threshold: float) -> None:
+        """Reset the collected data and start profiling."""
+        self.stop()
+        self.enabled = True
+        self.threshold = threshold
+        self.started = dt_util.utcnow().isoformat()
+        self.phases = {}
+        self.blocking.clear()
+        self._schedule_heartbeat()
+
+    def stop(self) -> None:
+        """Stop profiling, keeping the collected data for the report."""
+        self.enabled = False
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+
+    def span(self, phase: str, sync: bool = False):
+        """Time a phase; sync spans don't await, so they are checked for blocking."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, phase, sync)
+
+    def add(self, phase: str, seconds: float, sync: bool) -> None:
+        stats = self.phases.get(phase)
+        if stats is None:
+            stats = self.phases[phase] = PhaseStats()
+        stats.add(seconds)
+        if sync and seconds > self.threshold:
+            self._flag(phase, seconds)
+
+    def _flag(self, phase: str, seconds: float) -> None:
+        _LOGGER.warning("%s blocked the event loop for %.0f ms", phase, seconds * 1000)
+        self.blocking.append(
+            {"phase": phase, "ms": round(seconds * 1000, 1), "at": dt_util.utcnow().isoformat()}
+        )
+
+    def _schedule_heartbeat(self) -> None:
+        self._expected = time.monotonic() + PROFILE_LAG_INTERVAL
+        self._heartbeat = asyncio.get_running_loop().call_later(PROFILE_LAG_INTERVAL, self._beat)
+
+    def _beat(self) -> None:
+        # A late heartbeat means some callback, ours or not, held the loop
+        lag = time.monotonic() - self._expected
+        self.add("event_loop_lag", lag, False)
+        if lag > self.threshold:
+            self._flag("event_loop", lag)
+        self._schedule_heartbeat()
+
+    def as_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "started": self.started,
+            "threshold_ms": round(self.threshold * 1000, 1),
+            "phases": {phase: stats.as_dict() for phase, stats in sorted(self.phases.items())},
+            "blocking": list(self.blocking),
+        }
+
+
+class _Span:
+    __slots__ = ("_profiler", "_phase", "_sync", "_start")
+
+    def __init__(self, profiler: ElicaProfiler, phase: str, sync: bool) -> None:
+        self._profiler = profiler
+        self._phase = phase
+        self._sync = sync
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        self._profiler.add(self._phase, time.perf_counter() - self._start, self._sync)
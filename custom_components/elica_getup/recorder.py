@@ -0,0 +1,143 @@
+"""Opt-in recording of the traffic between the integration and the Elica cloud."""
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import aiohttp
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import TRAFFIC_RECORD_LIMIT, TRAFFIC_SAVE_DELAY
+
+TRACE_VERSION = 1
+
+# Never written to a recording; the token request form isn't recorded at all
+TO_REDACT = {
+    "access_token",
+    "refresh_token",
+    "username",
+    "password",
+    "app_uuid",
+    "email",
+    "serialNumber",
+    "mac",
+    "macAddress",
+    "ssid",
+    "ip",
+}
+
+
+class ElicaTrafficRecorder:
+    """Keep the last exchanges with the cloud, redacted and with timings.
+
+    The trace is persisted to a store and included in diagnostics, so a
+    slow or odd session seen in production can be replayed in tests
+    without credentials.
+    """
+
+    def __init__(self, store: Store, limit: int = TRAFFIC_RECORD_LIMIT) -> None:
+        self._store = store
+        self.exchanges: deque[dict] = deque(maxlen=limit)
+        self._started = time.monotonic()
+
+    async def async_load(self) -> None:
+        """Continue the trace recorded by a previous run."""
+        data = await self._store.async_load()
+        if data:
+            self.exchanges.extend(data.get("exchanges", []))
+        if self.exchanges:
+            # Keep offsets increasing across restarts
+            last = self.exchanges[-1]
+            self._started -= last["offset"] + last["latency"]
+
+    def wrap(self, session: aiohttp.ClientSession) -> "RecordingSession":
+        """Return a session that records what goes through session."""
+        return RecordingSession(session, self)
+
+    @callback
+    def record(
+        self,
+        method: str,
+        url: str,
+        started: float,
+        request: object,
+        status: int | None,
+        response: object,
+        error: str | None = None,
+    ) -> None:
+        self.exchanges.append(
+            {
+                "method": method,
+                "path": urlsplit(url).path,
+                "offset": round(started - self._started, 3),
+                "latency": round(time.monotonic() - started, 3),
+                "request": _redact(request),
+                "status": status,
+                "response": _redact(response),
+                "error": error,
+            }
+        )
+        self._store.async_delay_save(self.as_dict, TRAFFIC_SAVE_DELAY)
+
+    def as_dict(self) -> dict:
+        return {"version": TRACE_VERSION, "exchanges": list(self.exchanges)}
+
+
+class RecordingSession:
+    """Proxy for an aiohttp session that reports each exchange to a recorder."""
+
+    def __init__(self, session: aiohttp.ClientSession, recorder: ElicaTrafficRecorder) -> None:
+        self._session = session
+        self._recorder = recorder
+
+    def request(self, method: str, url: str, **kwargs) -> "_RecordedRequest":
+        return _RecordedRequest(self._session.request(method, url, **kwargs), self._recorder, method, url, kwargs)
+
+
+class _RecordedRequest:
+    """Async context manager around one request of a RecordingSession."""
+
+    def __init__(self, context, recorder: ElicaTrafficRecorder, method: str, url: str, kwargs: dict) -> None:
+        self._context = context
+        self._recorder = recorder
+        self._method = method
+        self._url = url
+        self._body = kwargs.get("json")
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        started = time.monotonic()
+        try:
+            resp = await self._context.__aenter__()
+        except (Exception, asyncio.CancelledError) as err:
+            self._recorder.record(self._method, self._url, started, self._body, None, None, type(err).__name__)
+            raise
+        try:
+            # The body is cached by aiohttp, so the caller can still read it
+            body = await resp.read()
+        except (Exception, asyncio.CancelledError) as err:
+            self._recorder.record(self._method, self._url, started, self._body, resp.status, None, type(err).__name__)
+            await self._context.__aexit__(type(err), err, err.__traceback__)
+            raise
+        self._recorder.record(self._method, self._url, started, self._body, resp.status, _decode(body))
+        return resp
+
+    async def __aexit__(self, *exc_info) -> bool | None:
+        return await self._context.__aexit__(*exc_info)
+
+
+def _decode(body: bytes) -> object:
+    if not body:
+        return None
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body.decode(errors="replace")
+
+
+def _redact(data: object) -> object:
+    if isinstance(data, (dict, list)):
+        return async_redact_data(data, TO_REDACT)
+    return data
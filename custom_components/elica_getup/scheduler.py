@@ -0,0 +1,45 @@
+"""Coordination of the Elica accounts configured in one Home Assistant."""
+import asyncio
+import math
+import time
+from collections.abc import Callable
+
+import aiohttp
+
+
+class ElicaScheduler:
+    """Shared by all Elica accounts of the domain.
+
+    Hands out the one pooled HTTP session, caps the requests in flight
+    across accounts, and spreads the accounts' polls evenly over the poll
+    interval so they don't reach the cloud and the event loop together.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, max_requests: int) -> None:
+        self.session = session
+        self.semaphore = asyncio.Semaphore(max_requests)
+        self._entries: list[str] = []
+        self._epoch = time.monotonic()
+
+    def register(self, entry_id: str) -> Callable[[], None]:
+        """Give entry_id a poll slot; returns a callback that frees it."""
+        self._entries.append(entry_id)
+
+        def _unregister() -> None:
+            self._entries.remove(entry_id)
+
+        return _unregister
+
+    def next_poll(self, entry_id: str, interval: float) -> float:
+        """Return the seconds until entry_id's next poll slot.
+
+        Slots of the registered entries are interval / N apart. The next one
+        is picked at least half an interval from now, so a poll never comes
+        much sooner or later than the interval asks for.
+        """
+        if entry_id not in self._entries:
+            return interval
+        offset = interval * self._entries.index(entry_id) / len(self._entries)
+        now = time.monotonic()
+        cycles = math.ceil((now + interval / 2 - self._epoch - offset) / interval)
+        return self._epoch + offset + cycles * interval - now
@@ -1,8 +1,83 @@
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from .const import DOMAIN
+from .entity import ElicaEntity
+from .metrics import ElicaMetrics, LatencyHistogram
+
+
+def _mean_ms(histogram: LatencyHistogram):
+    return None if histogram.mean is None else round(histogram.mean * 1000)
+
+
+@dataclass(frozen=True, kw_only=True)
+class ElicaMetricSensorDescription(SensorEntityDescription):
+    """Describes a cloud API metric sensor."""
+
+    value_fn: Callable[[ElicaMetrics], object]
+    attrs_fn: Callable[[ElicaMetrics], dict] | None = None
+
+
+METRIC_SENSORS = (
+    ElicaMetricSensorDescription(
+        key="poll_latency",
+        translation_key="poll_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda m: _mean_ms(m.poll_latency),
+        attrs_fn=lambda m: m.poll_latency.as_dict(),
+    ),
+    ElicaMetricSensorDescription(
+        key="command_latency",
+        translation_key="command_latency",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda m: _mean_ms(m.command_latency),
+        attrs_fn=lambda m: m.command_latency.as_dict(),
+    ),
+    ElicaMetricSensorDescription(
+        key="request_successes",
+        translation_key="request_successes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.successes,
+    ),
+    ElicaMetricSensorDescription(
+        key="request_failures",
+        translation_key="request_failures",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.failures,
+    ),
+    ElicaMetricSensorDescription(
+        key="unauthorized_responses",
+        translation_key="unauthorized_responses",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.unauthorized,
+    ),
+    ElicaMetricSensorDescription(
+        key="token_refreshes",
+        translation_key="token_refreshes",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda m: m.token_refreshes,
+    ),
+    ElicaMetricSensorDescription(
+        key="last_poll_success",
+        translation_key="last_poll_success",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda m: m.last_poll_success,
+    ),
+)
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -10,38 +85,63 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Elica Getup sensors from a config entry."""
-    entry_data = hass.data[DOMAIN][entry.entry_id]
-    devices = entry_data.get("devices", [])
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     entities = []
-    for device in devices:
-        entities.append(ElicaFilterSensor(hass, device, entry.entry_id, "filter_grease"))
-        entities.append(ElicaFilterSensor(hass, device, entry.entry_id, "filter_charcoal"))
-    async_add_entities(entities, True)
+    for hood in coordinator.data.values():
+        entities.append(ElicaFilterSensor(coordinator, hood, "filter_grease"))
+        entities.append(ElicaFilterSensor(coordinator, hood, "filter_charcoal"))
+    entities.extend(ElicaMetricSensor(coordinator, description) for description in METRIC_SENSORS)
+    async_add_entities(entities)
 
-class ElicaFilterSensor(SensorEntity):
-    _attr_has_entity_name = True
+class ElicaFilterSensor(ElicaEntity, SensorEntity):
 
-    def __init__(self, hass, device, entry_id, dp_id):
-        self.hass = hass
-        self._entry_id = entry_id
-        self._device_id = device["id"]
+    def __init__(self, coordinator, hood, dp_id):
+        super().__init__(coordinator, hood)
         self._dp_id = dp_id
+        self._inputs = frozenset({dp_id})
         self._attr_translation_key = "filter_carbon" if dp_id == "filter_charcoal" else "filter_grease"
         self._attr_unique_id = f"{self._device_id}_{dp_id}"
         self._attr_native_unit_of_measurement = "%"
 
     @property
-    def device_info(self):
-        device_name = self.hass.data[DOMAIN][self._entry_id].get("device_name", "Elica Getup")
-        return {
-            "identifiers": {(DOMAIN, self._device_id)},
-            "name": device_name,
+    def native_value(self):
+        return getattr(self._hood, self._dp_id)
+
+class ElicaMetricSensor(SensorEntity):
+    """Diagnostic sensor exposing how the account's cloud requests behave.
+
+    Updated after every poll, also when the hood data didn't change, since
+    the metrics still did. Not tied to the coordinator's availability, so the
+    metrics stay readable while the cloud is failing.
+    """
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    entity_description: ElicaMetricSensorDescription
+
+    def __init__(self, coordinator, description: ElicaMetricSensorDescription):
+        self.coordinator = coordinator
+        self.entity_description = description
+        entry_id = coordinator.entry.entry_id
+        self._attr_unique_id = f"{entry_id}_{description.key}"
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, entry_id)},
+            "name": f"{coordinator.device_name} cloud",
             "manufacturer": "Elica",
-            "model": "GetUp"
+            "entry_type": DeviceEntryType.SERVICE,
         }
 
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self.coordinator.async_add_poll_listener(self.async_write_ha_state))
+
     @property
     def native_value(self):
-        for d in self.hass.data[DOMAIN][self._entry_id]["devices"]:
-            if d["id"] == self._device_id: return d.get(self._dp_id, 0)
-        return 0
\ No newline at end of file
+        return self.entity_description.value_fn(self.coordinator.api.metrics)
+
+    @property
+    def extra_state_attributes(self):
+        if self.entity_description.attrs_fn is None:
+            return None
+        return self.entity_description.attrs_fn(self.coordinator.api.metrics)
\ No newline at end of file
@@ -0,0 +1,211 @@
+"""Services for the Elica Getup integration."""
+import asyncio
+import logging
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+
+from .const import (
+    DOMAIN,
+    SPEED_TO_CAPS,
+    ORDERED_NAMED_FAN_SPEEDS,
+    CLOSE_SETTLE_DELAY,
+    DEFAULT_PROFILE_THRESHOLD,
+)
+from .coordinator import ElicaCoordinator
+from .models import (
+    CAP_FAN_MODE,
+    CAP_FAN_SPEED,
+    CAP_LIGHT_LEVEL,
+    CAP_LIGHT_MODE,
+    CAP_POSITION,
+    POSITION_DOWN,
+    POSITION_LOWER,
+    POSITION_UP,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY_STATE = "apply_state"
+SERVICE_START_PRESET = "start_preset"
+SERVICE_SET_PROFILING = "set_profiling"
+SERVICE_APPLY_GROUP_STATE = "apply_group_state"
+
+EVENT_GROUP_COMMAND_DONE = f"{DOMAIN}_group_command_done"
+
+ATTR_DEVICE_ID = "device_id"
+ATTR_BRIGHTNESS = "brightness"
+ATTR_FAN_PRESET = "fan_preset"
+ATTR_POSITION = "position"
+ATTR_PRESET_ID = "preset_id"
+ATTR_ENABLED = "enabled"
+ATTR_BLOCK_THRESHOLD = "block_threshold"
+
+FAN_OFF = "off"
+POSITION_OPEN = "open"
+POSITION_CLOSED = "closed"
+
+STATE_FIELDS = {
+    vol.Optional(ATTR_BRIGHTNESS): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    vol.Optional(ATTR_FAN_PRESET): vol.In([FAN_OFF, *ORDERED_NAMED_FAN_SPEEDS]),
+    vol.Optional(ATTR_POSITION): vol.In([POSITION_OPEN, POSITION_CLOSED]),
+}
+
+APPLY_STATE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): cv.string,
+    **STATE_FIELDS,
+})
+
+APPLY_GROUP_STATE_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    **STATE_FIELDS,
+})
+
+START_PRESET_SCHEMA = vol.Schema({
+    vol.Required(ATTR_DEVICE_ID): cv.string,
+    vol.Required(ATTR_PRESET_ID): cv.string,
+})
+
+SET_PROFILING_SCHEMA = vol.Schema({
+    vol.Required(ATTR_ENABLED): cv.boolean,
+    vol.Optional(ATTR_BLOCK_THRESHOLD, default=DEFAULT_PROFILE_THRESHOLD): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=10000)
+    ),
+})
+
+
+def _get_hood(hass: HomeAssistant, device_id: str) -> tuple[ElicaCoordinator, str]:
+    """Return the coordinator and Elica id of the hood behind a device registry id."""
+    device = dr.async_get(hass).async_get(device_id)
+    if device is not None:
+        for domain, identifier in device.identifiers:
+            if domain != DOMAIN:
+                continue
+            for entry_id in device.config_entries:
+                entry_data = hass.data.get(DOMAIN, {}).get(entry_id)
+                if entry_data is not None and identifier in entry_data["coordinator"].hoods:
+                    return entry_data["coordinator"], identifier
+    raise ServiceValidationError(f"{device_id} is not a loaded Elica hood")
+
+
+def build_state_caps(hood, brightness=None, fan_preset=None, position=None) -> tuple[dict, dict | None]:
+    """Translate target states into one capabilities dict.
+
+    Returns the capabilities to send now and, when the hood has to be lowered,
+    the follow-up position command that must wait for light and fan to be off.
+    """
+    caps = {}
+    if brightness is not None:
+        caps.update({CAP_LIGHT_LEVEL: brightness, CAP_LIGHT_MODE: 1} if brightness else {CAP_LIGHT_LEVEL: 0})
+    if fan_preset is not None:
+        caps.update({CAP_FAN_SPEED: 0} if fan_preset == FAN_OFF else SPEED_TO_CAPS[fan_preset])
+    if position == POSITION_CLOSED:
+        # Like the cover, lower only after switching light and fan off
+        caps.update({CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0})
+        return caps, {CAP_POSITION: POSITION_LOWER}
+    if position == POSITION_OPEN or (
+        not hood.is_up
+        and (caps.get(CAP_LIGHT_LEVEL) or caps.get(CAP_FAN_SPEED) or caps.get(CAP_FAN_MODE, 0) > 1)
+    ):
+        # Raising is part of the same request as light and fan
+        caps[CAP_POSITION] = POSITION_UP
+    return caps, None
+
+
+async def _async_apply_state(hass: HomeAssistant, device_id: str, data: dict) -> bool:
+    """Send the target states in data to one hood.
+
+    Returns False when the cloud is unreachable and the command was queued
+    in the outbox instead.
+    """
+    coordinator, hood_id = _get_hood(hass, device_id)
+    caps, lower = build_state_caps(
+        coordinator.hoods[hood_id],
+        data.get(ATTR_BRIGHTNESS),
+        data.get(ATTR_FAN_PRESET),
+        data.get(ATTR_POSITION),
+    )
+    if not caps:
+        return True
+    coordinator.transitions.async_cancel(hood_id, caps)
+    sent = await coordinator.commands.async_submit(hood_id, caps)
+    if lower is not None:
+        sent = await coordinator.commands.async_submit(
+            hood_id, lower, requires={CAP_LIGHT_LEVEL: 0, CAP_FAN_SPEED: 0}, timeout=CLOSE_SETTLE_DELAY
+        ) and sent
+        caps = {**caps, CAP_POSITION: POSITION_DOWN}
+    coordinator.async_set_pending(hood_id, caps)
+    coordinator.async_note_command()
+    return sent
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Elica Getup services."""
+
+    async def async_apply_state(call: ServiceCall) -> None:
+        """Set light, fan and position of one hood in a single request."""
+        await _async_apply_state(hass, call.data[ATTR_DEVICE_ID], call.data)
+
+    async def async_apply_group_state(call: ServiceCall) -> ServiceResponse:
+        """Send one target state to many hoods at once.
+
+        Each hood is handled like apply_state, all concurrently; a failing
+        hood doesn't stop the others. A hood is queued rather than succeeded
+        when the cloud is unreachable and its command waits in the outbox.
+        The per-hood results are returned and fired as one event.
+        """
+        device_ids = list(dict.fromkeys(call.data[ATTR_DEVICE_ID]))
+        outcomes = await asyncio.gather(
+            *(_async_apply_state(hass, device_id, call.data) for device_id in device_ids),
+            return_exceptions=True,
+        )
+        results = []
+        for device_id, outcome in zip(device_ids, outcomes):
+            if isinstance(outcome, asyncio.CancelledError):
+                raise outcome
+            error = outcome if isinstance(outcome, BaseException) else None
+            if error is not None:
+                _LOGGER.warning("Group command for %s failed: %s", device_id, error)
+            results.append({
+                "device_id": device_id,
+                "success": outcome is True,
+                "queued": outcome is False,
+                "error": None if error is None else str(error),
+            })
+        response = {
+            "results": results,
+            "succeeded": sum(result["success"] for result in results),
+            "queued": sum(result["queued"] for result in results),
+            "failed": sum(result["error"] is not None for result in results),
+        }
+        hass.bus.async_fire(EVENT_GROUP_COMMAND_DONE, response)
+        return response
+
+    async def async_start_preset(call: ServiceCall) -> None:
+        """Start an Elica preset on one hood."""
+        coordinator, hood_id = _get_hood(hass, call.data[ATTR_DEVICE_ID])
+        await coordinator.api.async_start_preset(hood_id, call.data[ATTR_PRESET_ID])
+        # The preset's effect is only known from the cloud, so poll for it
+        coordinator.async_note_command()
+
+    async def async_set_profiling(call: ServiceCall) -> None:
+        """Start or stop profiling on every loaded Elica account."""
+        for entry_id, entry_data in hass.data.get(DOMAIN, {}).items():
+            profiler = entry_data["api"].profiler
+            if call.data[ATTR_ENABLED]:
+                profiler.start(call.data[ATTR_BLOCK_THRESHOLD] / 1000)
+            elif profiler.enabled:
+                profiler.stop()
+                _LOGGER.info("Elica profiling report for %s: %s", entry_id, profiler.as_dict())
+
+    hass.services.async_register(DOMAIN, SERVICE_APPLY_STATE, async_apply_state, schema=APPLY_STATE_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_APPLY_GROUP_STATE,
+        async_apply_group_state,
+        schema=APPLY_GROUP_STATE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(DOMAIN, SERVICE_START_PRESET, async_start_preset, schema=START_PRESET_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_SET_PROFILING, async_set_profiling, schema=SET_PROFILING_SCHEMA)
@@ -0,0 +1,100 @@
+"""Client-side transitions of hood capabilities."""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import RATE_LIMIT_BURST, RATE_LIMIT_PER_MINUTE, RATE_LIMIT_RESERVE, TRANSITION_STEP_BUDGET
+
+_LOGGER = logging.getLogger(__name__)
+
+# Share of the account's request rate transitions may use; the rest stays
+# free for polls and other commands
+_TRANSITION_RATE = RATE_LIMIT_PER_MINUTE / 60 * (1 - RATE_LIMIT_RESERVE / RATE_LIMIT_BURST)
+
+
+class ElicaTransitions:
+    """Fade capabilities of a hood in a bounded number of cloud calls.
+
+    The cloud has no transitions of its own, so a fade is sent as a few
+    intermediate values. The number of steps comes from a per-hood budget:
+    the account's spare request rate is shared by the running transitions
+    and capped at TRANSITION_STEP_BUDGET. A step whose time passes while an
+    earlier one is still being sent is skipped, so values never queue up
+    behind stale ones. Any new command for the same capabilities cancels
+    the transition.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.hass = hass
+        # Hood -> (capabilities being changed, task running the steps)
+        self._running: dict[str, tuple[frozenset, asyncio.Task]] = {}
+
+    def plan(self, start: int, target: int, duration: float) -> list[tuple[float, int]]:
+        """Return the (offset, value) steps from start to target.
+
+        Each step is sent at the start of its share of the duration with the
+        value for its end, so the first change is immediate and the target
+        is reached on time.
+        """
+        rate = _TRANSITION_RATE / (len(self._running) + 1)
+        count = max(1, min(TRANSITION_STEP_BUDGET, abs(target - start), int(duration * rate)))
+        return [
+            (duration * i / count, round(start + (target - start) * (i + 1) / count))
+            for i in range(count)
+        ]
+
+    @callback
+    def async_start(
+        self,
+        device_id: str,
+        steps: list[tuple[float, dict]],
+        send: Callable[[dict], Awaitable[None]],
+    ) -> None:
+        """Send the (offset, capabilities) steps for device_id in the background."""
+        keys = frozenset(key for _, caps in steps for key in caps)
+        self.async_cancel(device_id, keys)
+        task = self.hass.async_create_background_task(
+            self._async_run(device_id, steps, send), f"elica_getup transition {device_id}"
+        )
+        self._running[device_id] = (keys, task)
+
+    @callback
+    def async_cancel(self, device_id: str, caps) -> None:
+        """Stop the transition of device_id if it changes any of caps."""
+        running = self._running.get(device_id)
+        if running is not None and not running[0].isdisjoint(caps):
+            del self._running[device_id]
+            running[1].cancel()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel all transitions."""
+        for _, task in self._running.values():
+            task.cancel()
+        self._running.clear()
+
+    async def _async_run(
+        self, device_id: str, steps: list[tuple[float, dict]], send: Callable[[dict], Awaitable[None]]
+    ) -> None:
+        loop = self.hass.loop
+        started = loop.time()
+        index = 0
+        try:
+            while index < len(steps):
+                elapsed = loop.time() - started
+                # Jump to the latest step that is already due
+                while index + 1 < len(steps) and steps[index + 1][0] <= elapsed:
+                    index += 1
+                offset, caps = steps[index]
+                if offset > elapsed:
+                    await asyncio.sleep(offset - elapsed)
+                await send(caps)
+                index += 1
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error during transition of %s: %s", device_id, err)
+        finally:
+            running = self._running.get(device_id)
+            if running is not None and running[1] is asyncio.current_task():
+                del self._running[device_id]
@@ -0,0 +1,164 @@
+"""Scale benchmark: N accounts with M hoods each against the cloud stand-in.
+
+Skipped unless ELICA_BENCHMARK names the JSON file to write the results to:
+
+    ELICA_BENCHMARK=benchmark.json ELICA_BENCHMARK_ACCOUNTS=5 \
+        ELICA_BENCHMARK_HOODS=20 pytest tests/benchmarks
+
+Compare the file between commits to catch regressions in the poll and
+command hot paths.
+"""
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elica_getup.const import DOMAIN, UPDATE_INTERVAL, POLL_INTERVAL_BURST
+
+OUTPUT = os.environ.get("ELICA_BENCHMARK")
+ACCOUNTS = int(os.environ.get("ELICA_BENCHMARK_ACCOUNTS", 3))
+HOODS = int(os.environ.get("ELICA_BENCHMARK_HOODS", 10))
+CYCLES = int(os.environ.get("ELICA_BENCHMARK_CYCLES", 10))
+# Share of hoods whose fan speed changes between two polls
+CHURN = 0.1
+COMMANDS_PER_ACCOUNT = 5
+# Phases that run on the event loop without awaiting
+SYNC_PHASES = ("json_decode", "normalize", "state_write")
+
+pytestmark = pytest.mark.skipif(not OUTPUT, reason="set ELICA_BENCHMARK to the output file to run")
+
+
+@pytest.fixture
+def cloud_options() -> dict:
+    return {"hoods": HOODS}
+
+
+async def _setup_account(hass, username: str, password: str) -> MockConfigEntry:
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title=username,
+        unique_id=username,
+        data={"username": username, "password": password, "app_uuid": "bench", "device_name": username},
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    return entry
+
+
+def _percentiles(samples: list[float]) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49] * 1000, 2),
+        "p90": round(cuts[89] * 1000, 2),
+        "p99": round(cuts[98] * 1000, 2),
+        "max": round(max(samples) * 1000, 2),
+    }
+
+
+def _sync_time(profilers) -> float:
+    return sum(
+        stats.total
+        for profiler in profilers
+        for phase, stats in profiler.phases.items()
+        if phase in SYNC_PHASES
+    )
+
+
+async def test_scale(hass, elica_cloud) -> None:
+    """Measure setup, poll cycles and commands for the whole fleet."""
+    accounts = [(elica_cloud.username, elica_cloud.password, elica_cloud.hoods)]
+    for n in range(2, ACCOUNTS + 1):
+        username = f"user{n}@example.com"
+        accounts.append((username, "secret", elica_cloud.add_account(username, "secret", HOODS)))
+    rng = random.Random(0)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    # Measure the integration's own cost rather than the deliberate throttling
+    with patch("custom_components.elica_getup.api.RATE_LIMIT_BURST", 10**6):
+        entries = [await _setup_account(hass, username, password) for username, password, _ in accounts]
+        await hass.async_block_till_done()
+    setup = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    coordinators = [hass.data[DOMAIN][entry.entry_id]["coordinator"] for entry in entries]
+    profilers = [coordinator.api.profiler for coordinator in coordinators]
+    # One unmeasured cycle, so that the first poll's one-off costs (every
+    # entity's initial write, cold caches) don't skew the per-poll numbers
+    await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+    await hass.async_block_till_done()
+    for profiler in profilers:
+        profiler.start(0.05)
+
+    cpu, wall = [], []
+    for _ in range(CYCLES):
+        for _, _, hoods in accounts:
+            for hood in rng.sample(list(hoods.values()), max(1, int(len(hoods) * CHURN))):
+                hood.caps["110"] = rng.randint(0, 3)
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+        await hass.async_block_till_done()
+        cpu.append(time.process_time() - cpu_start)
+        wall.append(time.perf_counter() - wall_start)
+    writes = sum(profiler.phases["state_write"].count for profiler in profilers if "state_write" in profiler.phases)
+    integration_cpu = _sync_time(profilers)
+
+    registry = er.async_get(hass)
+
+    async def _command(hood_id: str) -> float:
+        entity_id = registry.async_get_entity_id("fan", DOMAIN, f"{hood_id}_fan")
+        command_start = time.perf_counter()
+        await hass.services.async_call("fan", "turn_off", {"entity_id": entity_id}, blocking=True)
+        return time.perf_counter() - command_start
+
+    latencies = await asyncio.gather(
+        *(
+            _command(hood_id)
+            for _, _, hoods in accounts
+            for hood_id in list(hoods)[:COMMANDS_PER_ACCOUNT]
+        )
+    )
+
+    for profiler in profilers:
+        profiler.stop()
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+
+    per_poll = writes / CYCLES
+    results = {
+        "accounts": ACCOUNTS,
+        "hoods_per_account": HOODS,
+        "cycles": CYCLES,
+        "churn": CHURN,
+        "python": platform.python_version(),
+        "setup_s": round(setup, 3),
+        "memory_per_hood_bytes": round(memory / (ACCOUNTS * HOODS)),
+        "poll_cycle": {
+            # The stand-in runs on the same loop, so cpu includes its share
+            "cpu_ms_mean": round(statistics.mean(cpu) * 1000, 3),
+            "cpu_ms_max": round(max(cpu) * 1000, 3),
+            "integration_cpu_ms_mean": round(integration_cpu / CYCLES * 1000, 3),
+            "wall_ms_mean": round(statistics.mean(wall) * 1000, 3),
+        },
+        "state_writes": {
+            "per_poll": per_poll,
+            "per_minute": per_poll * 60 / UPDATE_INTERVAL,
+            "per_minute_burst": per_poll * 60 / POLL_INTERVAL_BURST,
+        },
+        "command_latency_ms": _percentiles(latencies),
+        "blocking": [event for profiler in profilers for event in profiler.blocking],
+    }
+    path = Path(OUTPUT)
+    await hass.async_add_executor_job(path.write_text, json.dumps(results, indent=2) + "\n")
@@ -0,0 +1,71 @@
+"""Fixtures running the Elica Getup integration against a local cloud."""
+from unittest.mock import patch
+
+import pytest
+from aiohttp.test_utils import TestServer
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elica_getup.const import DOMAIN, CONF_COMMAND_WINDOW
+
+from .elica_cloud import API_PREFIX, FakeElicaCloud
+
+pytest_plugins = "pytest_homeassistant_custom_component"
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+def cloud_options() -> dict:
+    """Arguments for FakeElicaCloud; override in a test module to change them."""
+    return {}
+
+
+@pytest.fixture
+async def elica_cloud(cloud_options, socket_enabled):
+    """Start the cloud stand-in and point the integration at it.
+
+    The stand-in listens on 127.0.0.1, so sockets are enabled for the tests
+    using it.
+    """
+    cloud = FakeElicaCloud(**cloud_options)
+    server = TestServer(cloud.make_app())
+    await server.start_server()
+    base = str(server.make_url(API_PREFIX))
+    with patch.multiple(
+        "custom_components.elica_getup.api",
+        URL_TOKEN=f"{base}/oauth/token",
+        URL_DEVICES=f"{base}/devices",
+        URL_PRESETS_START=f"{base}/presets/start",
+    ):
+        yield cloud
+    await server.close()
+
+
+@pytest.fixture
+def config_entry(elica_cloud) -> MockConfigEntry:
+    """Config entry for the stand-in account."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title="Elica Getup",
+        unique_id=elica_cloud.username,
+        data={
+            "username": elica_cloud.username,
+            "password": elica_cloud.password,
+            "app_uuid": "af3c7b5d2f17b6da",
+            "device_name": "Elica Getup",
+        },
+        options={CONF_COMMAND_WINDOW: 50},
+    )
+
+
+@pytest.fixture
+async def init_integration(hass, config_entry) -> MockConfigEntry:
+    """Set up the integration against the stand-in."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
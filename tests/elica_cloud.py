@@ -0,0 +1,214 @@
+"""Local stand-in for the Elica cloud API.
+
+Implements the token, devices, commands and presets endpoints for one or
+more accounts with simple hood behaviour (capability state, cover travel,
+filter wear) plus knobs for latency, token expiry, server errors and hanging
+requests.
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+
+from aiohttp import web
+
+API_PREFIX = "/eiot-api/v1"
+
+# Position codes reported while the hood travels; the real cloud reports 1
+# when raised and 4 when lowered
+POSITION_UP = 1
+POSITION_DOWN = 4
+POSITION_RAISING = 2
+POSITION_LOWERING = 3
+
+
+@dataclass
+class FakeHood:
+    """State of one simulated hood."""
+
+    device_id: str
+    caps: dict = field(default_factory=lambda: {"64": 0, "71": 0, "96": 0, "110": 0, "53": POSITION_DOWN})
+    grease: float = 100.0
+    charcoal: float = 100.0
+    # Monotonic time at which the current cover move ends
+    move_until: float = 0.0
+    move_target: int = POSITION_DOWN
+    # Monotonic time of the last filter wear update
+    wear_at: float = field(default_factory=time.monotonic)
+
+    def tick(self, now: float, wear_per_second: float) -> None:
+        """Advance cover travel and filter wear to now."""
+        if self.move_until and now >= self.move_until:
+            self.caps["53"] = self.move_target
+            self.move_until = 0.0
+        elapsed = now - self.wear_at
+        self.wear_at = now
+        if self.caps["110"] or self.caps["64"] > 1:
+            self.grease = max(self.grease - elapsed * wear_per_second, 0)
+            self.charcoal = max(self.charcoal - elapsed * wear_per_second / 2, 0)
+
+    def as_json(self) -> dict:
+        return {
+            "id": self.device_id,
+            "type": "Hood",
+            "dataModel": {key: str(value) for key, value in self.caps.items()},
+            "filters": [
+                {"type": "grease", "efficiency": round(self.grease)},
+                {"type": "charcoal", "efficiency": round(self.charcoal)},
+            ],
+        }
+
+
+class FakeElicaCloud:
+    """aiohttp application emulating the Elica cloud."""
+
+    def __init__(
+        self,
+        hoods: int = 1,
+        travel_time: float = 0.5,
+        token_ttl: int = 3600,
+        wear_per_second: float = 0.0,
+        etag: bool = False,
+    ) -> None:
+        self.hoods = {f"hood{i}": FakeHood(f"hood{i}") for i in range(1, hoods + 1)}
+        self.travel_time = travel_time
+        self.token_ttl = token_ttl
+        self.wear_per_second = wear_per_second
+        # Whether the devices endpoint honours If-None-Match
+        self.etag = etag
+        # Fault injection
+        self.latency = 0.0
+        self.fail_status = 500
+        self.fail_next = 0
+        self.hang_next = 0
+        # Raw body the token endpoint answers with instead of a token
+        self.token_body: str | None = None
+        self.username = "user@example.com"
+        self.password = "secret"
+        # Username -> (password, hoods of that account)
+        self.accounts: dict[str, tuple[str, dict[str, FakeHood]]] = {
+            self.username: (self.password, self.hoods)
+        }
+        # Issued token -> monotonic expiry, and the account it belongs to
+        self.tokens: dict[str, float] = {}
+        self._owners: dict[str, str] = {}
+        self.requests: list[tuple[str, str, float]] = []
+        self.commands: list[tuple[str, dict]] = []
+        # Preset id -> capabilities it applies, and the presets started
+        self.preset_caps: dict[str, dict] = {}
+        self.presets: list[dict] = []
+        self._counter = itertools.count(1)
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(f"{API_PREFIX}/oauth/token", self._token)
+        app.router.add_get(f"{API_PREFIX}/devices", self._devices)
+        app.router.add_post(f"{API_PREFIX}/devices/{{device_id}}/commands", self._command)
+        app.router.add_post(f"{API_PREFIX}/presets/start", self._preset)
+        return app
+
+    def add_account(self, username: str, password: str, hoods: int) -> dict[str, FakeHood]:
+        """Add another account with its own hoods and return them."""
+        account = {f"{username}-hood{i}": FakeHood(f"{username}-hood{i}") for i in range(1, hoods + 1)}
+        self.accounts[username] = (password, account)
+        return account
+
+    def expire_tokens(self) -> None:
+        """Make every issued token invalid, as if it had expired."""
+        self.tokens.clear()
+
+    def count(self, method: str, path: str) -> int:
+        """Return how many requests hit method and path (without API prefix)."""
+        return sum(1 for m, p, _ in self.requests if m == method and p == API_PREFIX + path)
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        self.requests.append((request.method, request.path, time.monotonic()))
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.hang_next:
+            self.hang_next -= 1
+            await asyncio.sleep(3600)
+        if self.fail_next:
+            self.fail_next -= 1
+            return web.Response(status=self.fail_status)
+        return await handler(request)
+
+    def _account(self, request: web.Request) -> dict[str, FakeHood] | None:
+        """Return the hoods of the account the bearer token belongs to, advanced to now."""
+        auth = request.headers.get("Authorization", "")
+        if not auth.startswith("Bearer "):
+            return None
+        expires = self.tokens.get(auth[7:])
+        if expires is None or expires <= time.monotonic():
+            return None
+        hoods = self.accounts[self._owners[auth[7:]]][1]
+        now = time.monotonic()
+        for hood in hoods.values():
+            hood.tick(now, self.wear_per_second)
+        return hoods
+
+    async def _token(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        account = self.accounts.get(form.get("username"))
+        if account is None or form.get("password") != account[0]:
+            return web.json_response({"error": "invalid_grant"}, status=400)
+        if self.token_body is not None:
+            return web.Response(text=self.token_body, content_type="application/json")
+        token = f"token-{next(self._counter)}"
+        self.tokens[token] = time.monotonic() + self.token_ttl
+        self._owners[token] = form["username"]
+        return web.json_response(
+            {"access_token": token, "token_type": "bearer", "expires_in": self.token_ttl}
+        )
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        hoods = self._account(request)
+        if hoods is None:
+            return web.Response(status=401)
+        body = json.dumps([hood.as_json() for hood in hoods.values()])
+        if not self.etag:
+            return web.Response(text=body, content_type="application/json")
+        etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(text=body, content_type="application/json", headers={"ETag": etag})
+
+    async def _command(self, request: web.Request) -> web.Response:
+        hoods = self._account(request)
+        if hoods is None:
+            return web.Response(status=401)
+        hood = hoods.get(request.match_info["device_id"])
+        if hood is None:
+            return web.Response(status=404)
+        body = await request.json()
+        self.commands.append((hood.device_id, body["capabilities"]))
+        self._apply(hood, body["capabilities"])
+        return web.json_response({"status": "accepted"})
+
+    async def _preset(self, request: web.Request) -> web.Response:
+        hoods = self._account(request)
+        if hoods is None:
+            return web.Response(status=401)
+        body = await request.json()
+        self.presets.append(body)
+        hood = hoods.get(body.get("deviceId"))
+        caps = self.preset_caps.get(str(body.get("presetId")))
+        if hood is None or caps is None:
+            return web.Response(status=404)
+        self._apply(hood, caps)
+        return web.json_response({"status": "accepted"})
+
+    def _apply(self, hood: FakeHood, caps: dict) -> None:
+        for key, value in caps.items():
+            value = int(value)
+            if key == "53":
+                target = POSITION_UP if value == 1 else POSITION_DOWN
+                if hood.caps["53"] != target:
+                    hood.caps["53"] = POSITION_RAISING if target == POSITION_UP else POSITION_LOWERING
+                    hood.move_target = target
+                    hood.move_until = time.monotonic() + self.travel_time
+            else:
+                hood.caps[key] = value
@@ -0,0 +1,77 @@
+"""Replay recorded Elica cloud traffic in place of the aiohttp session.
+
+Traces come from the integration's "Record cloud traffic" option (the
+traffic store or the diagnostics download). Each request is answered by the
+next recorded exchange for the same method and path, after the recorded
+latency divided by speed; the last exchange of a path is repeated once the
+recording runs out.
+"""
+import asyncio
+import json
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import aiohttp
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def load_trace(name: str) -> dict:
+    """Load a trace from tests/fixtures."""
+    return json.loads((FIXTURES / name).read_text())
+
+
+class ReplayResponse:
+    """The parts of aiohttp.ClientResponse the integration uses."""
+
+    def __init__(self, status: int, body: object) -> None:
+        self.status = status
+        self.headers: dict[str, str] = {}
+        self._body = body
+
+    async def json(self, content_type: str | None = None) -> object:
+        return self._body
+
+    async def read(self) -> bytes:
+        return b"" if self._body is None else json.dumps(self._body).encode()
+
+
+class ReplaySession:
+    """aiohttp session stand-in answering from a trace."""
+
+    def __init__(self, trace: dict, speed: float = 1.0) -> None:
+        self.speed = speed
+        self._exchanges: dict[tuple[str, str], list[dict]] = {}
+        for exchange in trace["exchanges"]:
+            self._exchanges.setdefault((exchange["method"], exchange["path"]), []).append(exchange)
+        # (method, path, json body) of every request made
+        self.requests: list[tuple[str, str, object]] = []
+
+    def request(self, method: str, url: str, **kwargs) -> "_ReplayRequest":
+        path = urlsplit(url).path
+        self.requests.append((method, path, kwargs.get("json")))
+        queue = self._exchanges.get((method, path))
+        if not queue:
+            raise AssertionError(f"No recorded exchange for {method} {path}")
+        exchange = queue.pop(0) if len(queue) > 1 else queue[0]
+        return _ReplayRequest(exchange, self.speed)
+
+    def count(self, method: str, suffix: str) -> int:
+        """Return how many requests hit method and a path ending with suffix."""
+        return sum(1 for m, p, _ in self.requests if m == method and p.endswith(suffix))
+
+
+class _ReplayRequest:
+    def __init__(self, exchange: dict, speed: float) -> None:
+        self._exchange = exchange
+        self._speed = speed
+
+    async def __aenter__(self) -> ReplayResponse:
+        await asyncio.sleep(self._exchange["latency"] / self._speed)
+        if self._exchange.get("error"):
+            raise aiohttp.ClientConnectionError(self._exchange["error"])
+        return ReplayResponse(self._exchange["status"], self._exchange["response"])
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
@@ -0,0 +1,20 @@
+"""Tests for the access token manager."""
+import asyncio
+
+from custom_components.elica_getup.auth import ElicaTokenManager
+
+
+async def test_short_lived_token_is_not_renewed_in_a_loop() -> None:
+    """A token shorter than the refresh margin is still used for a while."""
+    fetches = []
+
+    async def _fetch():
+        fetches.append(None)
+        return f"token{len(fetches)}", 120
+
+    tokens = ElicaTokenManager(_fetch)
+    assert await tokens.async_get_token() == "token1"
+    await asyncio.sleep(0.05)
+    assert await tokens.async_get_token() == "token1"
+    assert len(fetches) == 1
+    tokens.stop()
@@ -0,0 +1,52 @@
+"""Tests for the cloud circuit breaker."""
+from unittest.mock import patch
+
+from custom_components.elica_getup.breaker import (
+    ElicaCircuitBreaker,
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+)
+
+
+def test_opens_after_threshold_and_probes_with_backoff() -> None:
+    """Failed probes double the delay until the cap; a good one closes it."""
+    breaker = ElicaCircuitBreaker(threshold=2, probe_delay=10, probe_delay_max=30)
+    with patch("custom_components.elica_getup.breaker.random.uniform", return_value=1), patch(
+        "custom_components.elica_getup.breaker.time.monotonic", return_value=0
+    ) as now:
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == STATE_OPEN
+        assert not breaker.allow()
+        assert breaker.retry_in == 10
+
+        now.return_value = 10
+        assert breaker.allow()
+        assert breaker.state == STATE_HALF_OPEN
+        # Only one probe at a time
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.retry_in == 20
+
+        now.return_value = 30
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.retry_in == 30
+
+        now.return_value = 60
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == STATE_CLOSED
+        assert breaker.trips == 1
+
+
+def test_released_probe_can_be_retried() -> None:
+    """A probe that never reached the cloud doesn't count as a failure."""
+    breaker = ElicaCircuitBreaker(threshold=1, probe_delay=0, probe_delay_max=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == STATE_OPEN
+    assert breaker.allow()
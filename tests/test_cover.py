@@ -0,0 +1,54 @@
+"""Tests for the Elica Getup cover."""
+import asyncio
+
+import pytest
+from homeassistant.const import STATE_CLOSED, STATE_CLOSING, STATE_OPEN
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.elica_getup.api import ElicaApiError
+from custom_components.elica_getup.const import DOMAIN
+
+
+async def test_close_finishes_when_poll_reports_down(hass, elica_cloud, init_integration) -> None:
+    """The cover stops closing as soon as the cloud reports it down."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    elica_cloud.hoods["hood1"].caps["53"] = 1
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    cover = er.async_get(hass).async_get_entity_id("cover", DOMAIN, "hood1_cover")
+    assert hass.states.get(cover).state == STATE_OPEN
+
+    await hass.services.async_call("cover", "close_cover", {"entity_id": cover}, blocking=True)
+    state = hass.states.get(cover)
+    assert state.state == STATE_CLOSING
+    assert state.attributes["current_position"] == 100
+
+    # A poll confirms light and fan off, which releases the lowering command
+    await asyncio.sleep(0.1)
+    await coordinator.async_refresh()
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+    assert elica_cloud.commands[-1] == ("hood1", {"53": 0})
+
+    await asyncio.sleep(elica_cloud.travel_time)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    state = hass.states.get(cover)
+    assert state.state == STATE_CLOSED
+    assert state.attributes["current_position"] == 0
+
+
+async def test_rejected_open_stops_the_move(hass, elica_cloud, init_integration) -> None:
+    """A command the cloud rejects leaves the cover closed, not opening."""
+    cover = er.async_get(hass).async_get_entity_id("cover", DOMAIN, "hood1_cover")
+    assert hass.states.get(cover).state == STATE_CLOSED
+    elica_cloud.fail_status = 400
+    elica_cloud.fail_next = 1
+
+    with pytest.raises(ElicaApiError):
+        await hass.services.async_call("cover", "open_cover", {"entity_id": cover}, blocking=True)
+    await hass.async_block_till_done()
+
+    state = hass.states.get(cover)
+    assert state.state == STATE_CLOSED
+    assert state.attributes["current_position"] == 0
@@ -0,0 +1,294 @@
+"""Tests for the Elica Getup integration against the cloud stand-in."""
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_ON, STATE_UNAVAILABLE
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.elica_getup.api import ElicaApiError
+from custom_components.elica_getup.const import DOMAIN
+from custom_components.elica_getup.sensor import METRIC_SENSORS
+
+
+def _entity_id(hass, platform: str, unique_id: str) -> str:
+    return er.async_get(hass).async_get_entity_id(platform, DOMAIN, unique_id)
+
+
+async def _settle(hass, seconds: float = 0.1) -> None:
+    """Let coalescing windows expire and queued commands reach the cloud."""
+    await asyncio.sleep(seconds)
+    await hass.async_block_till_done()
+
+
+async def test_setup_creates_entities(hass, elica_cloud, init_integration) -> None:
+    """Every hood gets its fan, light, cover and two filter sensors."""
+    assert init_integration.state is ConfigEntryState.LOADED
+    entries = er.async_entries_for_config_entry(er.async_get(hass), init_integration.entry_id)
+    assert len([entry for entry in entries if entry.unique_id.startswith("hood1_")]) == 5
+    # Plus the account's cloud metric sensors
+    assert len(entries) == 5 + len(METRIC_SENSORS)
+    assert elica_cloud.count("POST", "/oauth/token") == 1
+
+
+async def test_light_slider_is_coalesced(hass, elica_cloud, init_integration) -> None:
+    """Rapid brightness changes on a raised hood become one request."""
+    elica_cloud.hoods["hood1"].caps["53"] = 1
+    await hass.data[DOMAIN][init_integration.entry_id]["coordinator"].async_refresh()
+    light = _entity_id(hass, "light", "hood1_light")
+
+    await asyncio.gather(
+        *(
+            hass.services.async_call("light", "turn_on", {"entity_id": light, "brightness": b}, blocking=True)
+            for b in (64, 128, 255)
+        )
+    )
+    await _settle(hass)
+
+    assert elica_cloud.commands == [("hood1", {"96": 100, "71": 1})]
+    assert hass.states.get(light).state == STATE_ON
+
+
+async def test_expired_token_is_renewed_for_commands(hass, elica_cloud, init_integration) -> None:
+    """A command sent with an expired token is retried after renewal."""
+    elica_cloud.expire_tokens()
+    fan = _entity_id(hass, "fan", "hood1_fan")
+
+    await hass.services.async_call("fan", "turn_off", {"entity_id": fan}, blocking=True)
+    await _settle(hass)
+
+    assert elica_cloud.commands == [("hood1", {"110": 0})]
+    assert elica_cloud.count("POST", "/oauth/token") == 2
+
+
+async def test_unload_drops_batched_commands(hass, elica_cloud, init_integration) -> None:
+    """A command still inside its coalescing window is not sent after unload."""
+    commands = hass.data[DOMAIN][init_integration.entry_id]["coordinator"].commands
+    send = hass.async_create_task(commands.async_send("hood1", {"110": 0}))
+    await asyncio.sleep(0)
+
+    assert await hass.config_entries.async_unload(init_integration.entry_id)
+    with pytest.raises(ElicaApiError):
+        await send
+    await _settle(hass)
+    assert elica_cloud.commands == []
+
+
+async def test_light_waits_for_hood_to_raise(hass, elica_cloud, init_integration) -> None:
+    """Turning the light on raises the hood first and returns immediately."""
+    light = _entity_id(hass, "light", "hood1_light")
+
+    await hass.services.async_call("light", "turn_on", {"entity_id": light}, blocking=True)
+    await _settle(hass)
+    assert elica_cloud.commands == [("hood1", {"53": 1})]
+
+    # The stand-in finishes travelling; the next poll releases the light command
+    await asyncio.sleep(elica_cloud.travel_time)
+    await hass.data[DOMAIN][init_integration.entry_id]["coordinator"].async_refresh()
+    await _settle(hass)
+    assert elica_cloud.commands[-1] == ("hood1", {"96": 100, "71": 1})
+
+
+async def test_cloud_errors_mark_entities_unavailable(hass, elica_cloud, init_integration) -> None:
+    """Failed polls make the entities unavailable until the cloud recovers."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    fan = _entity_id(hass, "fan", "hood1_fan")
+
+    elica_cloud.fail_next = 1
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(fan).state == STATE_UNAVAILABLE
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(fan).state != STATE_UNAVAILABLE
+
+
+async def test_stale_poll_does_not_revert_command(hass, elica_cloud, init_integration) -> None:
+    """A poll still reporting the old value keeps showing the commanded one."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    elica_cloud.hoods["hood1"].caps["53"] = 1
+    await coordinator.async_refresh()
+    fan = _entity_id(hass, "fan", "hood1_fan")
+
+    await hass.services.async_call("fan", "set_preset_mode", {"entity_id": fan, "preset_mode": "2"}, blocking=True)
+    await _settle(hass)
+    # The cloud hasn't applied the command yet
+    elica_cloud.hoods["hood1"].caps.update({"64": 0, "110": 0})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(fan).attributes["preset_mode"] == "2"
+
+    elica_cloud.hoods["hood1"].caps.update({"64": 1, "110": 2})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert not coordinator.hoods["hood1"].pending
+    assert hass.states.get(fan).attributes["preset_mode"] == "2"
+
+
+async def test_metrics_update_on_every_failed_poll(hass, elica_cloud, init_integration) -> None:
+    """The metric sensors hear about each failed poll, not only the first."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    # The metric sensors listen like this
+    poll_listener = Mock()
+    coordinator.async_add_poll_listener(poll_listener)
+
+    elica_cloud.fail_next = 2
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert not coordinator.last_update_success
+    assert poll_listener.call_count == 2
+
+
+async def test_setup_from_snapshot_when_cloud_is_down(hass, hass_storage, elica_cloud, config_entry) -> None:
+    """Entities come from the persisted snapshot without waiting for the cloud."""
+    key = f"{DOMAIN}.{config_entry.entry_id}.snapshot"
+    hass_storage[key] = {
+        "version": 1,
+        "key": key,
+        "data": {
+            "hoods": [
+                {
+                    "device_id": "hood1",
+                    "caps": {"64": 1, "71": 1, "96": 50, "110": 2, "53": 1},
+                    "filter_grease": 80,
+                    "filter_charcoal": 90,
+                }
+            ]
+        },
+    }
+    # The background refresh never completes while the test runs
+    elica_cloud.hang_next = 10
+
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    fan = _entity_id(hass, "fan", "hood1_fan")
+    assert hass.states.get(fan).attributes["preset_mode"] == "2"
+
+
+async def test_open_circuit_parks_commands(hass, elica_cloud, init_integration) -> None:
+    """After repeated failed polls commands go to the outbox without a request."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    fan = _entity_id(hass, "fan", "hood1_fan")
+
+    elica_cloud.fail_next = 3
+    for _ in range(3):
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert hass.states.get(fan).state == STATE_UNAVAILABLE
+    assert coordinator.update_interval.total_seconds() <= 40
+
+    requests = len(elica_cloud.requests)
+    await coordinator.commands.async_submit("hood1", {"110": 2})
+    await _settle(hass)
+    assert len(elica_cloud.requests) == requests
+    assert coordinator.commands.outbox["hood1"]["110"][0] == 2
+
+
+async def test_outbox_is_compacted_and_sent_after_outage(hass, elica_cloud, init_integration) -> None:
+    """Failed commands are merged, stale ones dropped, and sent once the cloud is back."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    commands = coordinator.commands
+
+    for caps in ({"110": 1, "96": 30, "71": 1}, {"110": 3}):
+        elica_cloud.fail_next = 1
+        await commands.async_submit("hood1", caps)
+    await _settle(hass)
+    assert elica_cloud.commands == []
+    # The light change was issued too long ago to still matter
+    commands.outbox["hood1"]["96"][1] -= 3600
+
+    with patch("custom_components.elica_getup.commands.OUTBOX_JITTER", 0):
+        await coordinator.async_refresh()
+        await _settle(hass)
+
+    assert elica_cloud.commands == [("hood1", {"110": 3, "71": 1})]
+    assert commands.outbox == {}
+
+
+async def test_parked_close_of_closed_hood_is_dropped(hass, elica_cloud, init_integration) -> None:
+    """A lower parked during an outage is done once the hood reports it down."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+
+    elica_cloud.fail_next = 1
+    await coordinator.commands.async_submit("hood1", {"53": 0})
+    await _settle(hass)
+    assert coordinator.commands.outbox["hood1"]["53"][0] == 0
+
+    with patch("custom_components.elica_getup.commands.OUTBOX_JITTER", 0):
+        await coordinator.async_refresh()
+        await _settle(hass)
+
+    assert elica_cloud.commands == []
+    assert coordinator.commands.outbox == {}
+
+
+async def test_hung_request_times_out(hass, elica_cloud, init_integration) -> None:
+    """A request the cloud never answers fails after its timeout."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+
+    elica_cloud.hang_next = 1
+    with patch("custom_components.elica_getup.api.TIMEOUT_POLL", 0.1):
+        await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.api.breaker.failures == 1
+
+
+@pytest.mark.parametrize("body", ["<html>maintenance</html>", "[]"], ids=["not_json", "not_object"])
+async def test_malformed_token_response_counts_as_failure(hass, elica_cloud, init_integration, body) -> None:
+    """A token endpoint answering garbage fails the poll through the breaker."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+
+    elica_cloud.expire_tokens()
+    elica_cloud.token_body = body
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+    assert coordinator.api.breaker.failures == 1
+
+    elica_cloud.token_body = None
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+
+
+@pytest.mark.parametrize("cloud_options", [{}, {"etag": True}], ids=["hash", "etag"])
+async def test_poll_without_changes_writes_no_state(hass, elica_cloud, init_integration) -> None:
+    """A processed poll that changes none of the hood's inputs writes nothing."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    # A field the integration doesn't use, so the poll is decoded but the same
+    elica_cloud.hoods["hood1"].caps["999"] = 1
+    coordinator.api.profiler.start(1)
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    coordinator.api.profiler.stop()
+
+    assert coordinator.api.metrics.unchanged_polls == 0
+    assert "state_write" not in coordinator.api.profiler.phases
+
+
+async def test_unchanged_poll_is_skipped(hass, elica_cloud, init_integration) -> None:
+    """An identical device list is neither processed nor passed to the entities."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    listener = Mock()
+    coordinator.async_add_listener(listener)
+    # The metric sensors listen like this
+    poll_listener = Mock()
+    coordinator.async_add_poll_listener(poll_listener)
+
+    await coordinator.async_refresh()
+    assert listener.call_count == 0
+    assert poll_listener.call_count == 1
+    assert coordinator.api.metrics.unchanged_polls == 1
+
+    elica_cloud.hoods["hood1"].caps.update({"64": 1, "110": 2})
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert listener.call_count == 1
+    assert hass.states.get(_entity_id(hass, "fan", "hood1_fan")).attributes["preset_mode"] == "2"
+
@@ -0,0 +1,36 @@
+"""Tests for the per-account request rate limiter."""
+import asyncio
+
+from custom_components.elica_getup.limiter import (
+    ElicaRateLimiter,
+    PRIORITY_COMMAND,
+    PRIORITY_DIAGNOSTIC,
+    PRIORITY_POLL,
+)
+
+
+async def test_background_requests_keep_reserve_for_commands() -> None:
+    """Polls stop once only the reserve is left; commands may still use it."""
+    limiter = ElicaRateLimiter(rate=0.001, burst=5, reserve=2)
+
+    assert [limiter.try_acquire(PRIORITY_POLL) for _ in range(4)] == [True, True, True, False]
+    assert not limiter.try_acquire(PRIORITY_DIAGNOSTIC)
+
+    for _ in range(2):
+        await limiter.async_acquire(PRIORITY_COMMAND)
+    assert limiter.tokens < 1
+
+
+async def test_waiters_are_served_by_priority() -> None:
+    """Once the bucket is empty, tokens go to the highest priority first."""
+    limiter = ElicaRateLimiter(rate=20, burst=1, reserve=0)
+    await limiter.async_acquire()
+    served = []
+
+    async def _acquire(name, priority):
+        await limiter.async_acquire(priority)
+        served.append(name)
+
+    await asyncio.gather(_acquire("poll", PRIORITY_POLL), _acquire("command", PRIORITY_COMMAND))
+
+    assert served == ["command", "poll"]
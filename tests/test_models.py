@@ -0,0 +1,72 @@
+"""Tests for decoding cloud devices into hood state and pending values."""
+from unittest.mock import patch
+
+from custom_components.elica_getup.models import HoodState, decode_device
+
+DEVICE = {
+    "id": "hood1",
+    "type": "Hood",
+    "name": "Kitchen",
+    "dataModel": {"53": "1", "64": "1", "71": "1", "96": "80.0", "110": "2", "124": "7", "200": "x"},
+    "filters": [{"type": "grease", "efficiency": 73}, {"type": "charcoal", "efficiency": 88}],
+    "metadata": {"firmware": "1.2.3"},
+}
+
+
+def test_decode_keeps_only_schema_fields() -> None:
+    """Unused capabilities and metadata are dropped; values become numbers."""
+    device_id, values = decode_device(DEVICE)
+    assert device_id == "hood1"
+    assert values == (1, 1, 80, 2, 1, 73, 88)
+
+    _, values = decode_device({"id": "hood2", "dataModel": {"96": "bad"}})
+    assert values == (None,) * 7
+
+
+def test_decode_keeps_fractional_filter_efficiency() -> None:
+    """Filter efficiencies are not truncated to whole percents."""
+    filters = [{"type": "grease", "efficiency": 87.5}, {"type": "charcoal", "efficiency": "12.25"}]
+    device = {**DEVICE, "filters": filters}
+    hood = HoodState("hood1")
+    hood.update_decoded(decode_device(device)[1])
+    assert hood.filter_grease == 87.5
+    assert hood.filter_charcoal == 12.25
+
+
+def test_unchanged_values_are_skipped() -> None:
+    """Decoding the same device again reports no change."""
+    hood = HoodState("hood1")
+    assert hood.update_decoded(decode_device(DEVICE)[1]) >= {"96", "110", "filter_grease"}
+    assert hood.brightness == 204
+    assert hood.preset_mode == "2"
+    assert hood.update_decoded(decode_device(DEVICE)[1]) == frozenset()
+
+
+def test_pending_value_survives_stale_poll_until_confirmed() -> None:
+    """A command value is shown until the cloud reports it."""
+    hood = HoodState("hood1")
+    with patch("custom_components.elica_getup.models.time.monotonic", return_value=0):
+        assert "110" in hood.set_pending({"110": 3}, 60)
+        # A poll that was already in flight still reports the old speed
+        assert hood.update({"110": 1}) == frozenset()
+        assert hood.caps["110"] == 3
+        assert hood.pending
+
+        hood.update({"110": 3})
+        assert not hood.pending
+        assert hood.caps["110"] == 3
+
+
+def test_pending_value_expires_after_ttl() -> None:
+    """A command the hood never applied stops being shown after the TTL."""
+    hood = HoodState("hood1")
+    with patch("custom_components.elica_getup.models.time.monotonic", return_value=0) as now:
+        hood.set_pending({"96": 50}, 60)
+        now.return_value = 59
+        hood.update({"96": 0})
+        assert hood.caps["96"] == 50
+
+        now.return_value = 60
+        assert hood.update({"96": 0}) == {"96"}
+        assert not hood.pending
+        assert hood.caps["96"] == 0
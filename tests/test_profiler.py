@@ -0,0 +1,30 @@
+"""Tests for the profiling spans and blocking detection."""
+import asyncio
+import time
+
+from custom_components.elica_getup.profiler import ElicaProfiler
+
+
+async def test_blocking_work_is_flagged() -> None:
+    """Synchronous spans and loop stalls over the threshold are reported."""
+    profiler = ElicaProfiler()
+    with profiler.span("normalize", sync=True):
+        time.sleep(0.01)
+    assert profiler.as_dict()["phases"] == {}
+
+    profiler.start(0.005)
+    with profiler.span("normalize", sync=True):
+        time.sleep(0.01)
+    # Awaiting spans are timed but never count as blocking
+    with profiler.span("devices_get"):
+        await asyncio.sleep(0.01)
+    # Stall the loop past the next heartbeat
+    await asyncio.sleep(0.45)
+    time.sleep(0.2)
+    await asyncio.sleep(0.01)
+    profiler.stop()
+
+    report = profiler.as_dict()
+    assert report["phases"]["normalize"]["count"] == 1
+    assert report["phases"]["devices_get"]["count"] == 1
+    assert [event["phase"] for event in report["blocking"]] == ["normalize", "event_loop"]
@@ -0,0 +1,70 @@
+"""Tests replaying recorded Elica cloud traffic."""
+import json
+import time
+from unittest.mock import patch
+
+from homeassistant.const import STATE_OPEN, STATE_OPENING
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.elica_getup.api import ElicaApi
+from custom_components.elica_getup.const import DOMAIN, CONF_COMMAND_WINDOW, CONF_RECORD_TRAFFIC
+
+from .replay import ReplaySession, load_trace
+
+ENTRY_DATA = {
+    "username": "user@example.com",
+    "password": "secret",
+    "app_uuid": "af3c7b5d2f17b6da",
+    "device_name": "Elica Getup",
+}
+
+
+async def test_slow_cloud_trace(hass) -> None:
+    """A trace with 2 s polls still sets up fast and raises the hood."""
+    session = ReplaySession(load_trace("trace_slow_raise.json"), speed=20)
+    entry = MockConfigEntry(domain=DOMAIN, data=ENTRY_DATA, options={CONF_COMMAND_WINDOW: 50})
+    entry.add_to_hass(hass)
+
+    with patch("custom_components.elica_getup.async_get_clientsession", return_value=session):
+        start = time.monotonic()
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        # Token and first poll at the recorded latency, 2.5 s, sped up 20x
+        assert time.monotonic() - start < 0.5
+
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        cover = er.async_get(hass).async_get_entity_id("cover", DOMAIN, "5f3a9c1e_cover")
+        await hass.services.async_call("cover", "open_cover", {"entity_id": cover}, blocking=True)
+        assert session.requests[-1][2]["capabilities"] == {"53": 1}
+
+        # The cloud reports the hood travelling twice, then up
+        for expected in (STATE_OPENING, STATE_OPENING, STATE_OPEN):
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            assert hass.states.get(cover).state == expected
+
+    assert session.count("POST", "/oauth/token") == 1
+    assert coordinator.api.metrics.poll_latency.last < 0.5
+
+
+async def test_recorded_traffic_is_redacted_and_replays(hass, elica_cloud, config_entry) -> None:
+    """Traffic recorded against the cloud replays into the same hood state."""
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry, options={**config_entry.options, CONF_RECORD_TRAFFIC: True}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    data = hass.data[DOMAIN][config_entry.entry_id]
+    trace = data["recorder"].as_dict()
+
+    dumped = json.dumps(trace)
+    assert elica_cloud.password not in dumped
+    assert not any(token in dumped for token in elica_cloud.tokens)
+    assert [(e["method"], e["status"]) for e in trace["exchanges"]] == [("POST", 200), ("GET", 200)]
+
+    api = ElicaApi(ReplaySession(trace, speed=100), "user", "pass", "app")
+    devices = await api.async_get_devices()
+    api.tokens.stop()
+    assert devices == [hood.as_json() for hood in elica_cloud.hoods.values()]
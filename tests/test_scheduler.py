@@ -0,0 +1,60 @@
+"""Tests for the domain-wide poll scheduler and request cap."""
+import asyncio
+from unittest.mock import patch
+
+from custom_components.elica_getup.api import ElicaApi
+from custom_components.elica_getup.scheduler import ElicaScheduler
+
+
+def test_polls_are_spread_over_the_interval() -> None:
+    """Accounts get evenly spaced slots, each about one interval away."""
+    with patch("custom_components.elica_getup.scheduler.time.monotonic", return_value=1000.0):
+        scheduler = ElicaScheduler(None, 4)
+        unregister = [scheduler.register(entry_id) for entry_id in ("a", "b", "c")]
+        delays = [scheduler.next_poll(entry_id, 60) for entry_id in ("a", "b", "c")]
+        assert sorted(round(delay % 60) for delay in delays) == [0, 20, 40]
+        assert all(30 <= delay < 90 for delay in delays)
+
+        unregister[1]()
+        assert round(scheduler.next_poll("c", 60) - scheduler.next_poll("a", 60)) % 60 == 30
+
+
+class _CountingSession:
+    """Session stand-in that records how many requests run at once."""
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.peak = 0
+
+    def request(self, method, url, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.status = 200
+        self.headers = {}
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.active -= 1
+
+    async def read(self) -> bytes:
+        return b"[]"
+
+    async def json(self, content_type=None):
+        return {"access_token": "token", "expires_in": 3600}
+
+
+async def test_requests_in_flight_are_capped() -> None:
+    """Accounts sharing the scheduler never exceed its concurrency cap."""
+    session = _CountingSession()
+    scheduler = ElicaScheduler(session, 2)
+    apis = [ElicaApi(session, f"user{n}", "secret", "app", semaphore=scheduler.semaphore) for n in range(5)]
+
+    await asyncio.gather(*(api.async_get_devices() for api in apis))
+    for api in apis:
+        api.tokens.stop()
+
+    assert session.peak == 2
@@ -0,0 +1,111 @@
+"""Tests for the Elica Getup services."""
+import asyncio
+
+import pytest
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from custom_components.elica_getup.const import DOMAIN
+
+
+def _device_id(hass, hood_id: str) -> str:
+    return dr.async_get(hass).async_get_device(identifiers={(DOMAIN, hood_id)}).id
+
+
+async def test_apply_state_is_one_request(hass, elica_cloud, init_integration) -> None:
+    """Raise, light and fan targets are delivered as a single command."""
+    await hass.services.async_call(
+        DOMAIN,
+        "apply_state",
+        {"device_id": _device_id(hass, "hood1"), "brightness": 80, "fan_preset": "2"},
+        blocking=True,
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert elica_cloud.commands == [
+        ("hood1", {"96": 80, "71": 1, "64": 1, "110": 2, "53": 1})
+    ]
+
+
+@pytest.mark.parametrize("cloud_options", [{"hoods": 3}])
+async def test_apply_group_state(hass, elica_cloud, init_integration) -> None:
+    """Every hood gets the target, and an unknown device fails on its own."""
+    events = []
+    hass.bus.async_listen(f"{DOMAIN}_group_command_done", events.append)
+    device_ids = [_device_id(hass, hood_id) for hood_id in elica_cloud.hoods]
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "apply_group_state",
+        {"device_id": [*device_ids, "missing"], "fan_preset": "1"},
+        blocking=True,
+        return_response=True,
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert sorted(hood for hood, _ in elica_cloud.commands) == ["hood1", "hood2", "hood3"]
+    assert (response["succeeded"], response["queued"], response["failed"]) == (3, 0, 1)
+    assert response["results"][-1]["device_id"] == "missing"
+    assert not response["results"][-1]["success"]
+    assert len(events) == 1
+    assert events[0].data == response
+
+
+@pytest.mark.parametrize("cloud_options", [{"hoods": 2}])
+async def test_apply_group_state_while_cloud_is_down(hass, elica_cloud, init_integration) -> None:
+    """Hoods whose command waits in the outbox are reported as queued, not succeeded."""
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    elica_cloud.fail_next = 3
+    for _ in range(3):
+        await coordinator.async_refresh()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        "apply_group_state",
+        {"device_id": [_device_id(hass, hood_id) for hood_id in elica_cloud.hoods], "fan_preset": "1"},
+        blocking=True,
+        return_response=True,
+    )
+    await asyncio.sleep(0.1)
+    await hass.async_block_till_done()
+
+    assert elica_cloud.commands == []
+    assert (response["succeeded"], response["queued"], response["failed"]) == (0, 2, 0)
+    assert all(result["queued"] and not result["success"] for result in response["results"])
+    assert set(coordinator.commands.outbox) == {"hood1", "hood2"}
+
+
+async def test_start_preset(hass, elica_cloud, init_integration) -> None:
+    """Presets are started through the presets endpoint."""
+    elica_cloud.preset_caps["7"] = {"53": 1, "96": 100}
+
+    await hass.services.async_call(
+        DOMAIN,
+        "start_preset",
+        {"device_id": _device_id(hass, "hood1"), "preset_id": "7"},
+        blocking=True,
+    )
+
+    assert elica_cloud.presets == [{"deviceId": "hood1", "presetId": "7"}]
+    assert elica_cloud.hoods["hood1"].caps["96"] == 100
+
+
+async def test_set_profiling_reports_phases(hass, elica_cloud, init_integration) -> None:
+    """Profiling records the poll, decode, normalization and command phases."""
+    api = hass.data[DOMAIN][init_integration.entry_id]["api"]
+    coordinator = hass.data[DOMAIN][init_integration.entry_id]["coordinator"]
+    await hass.services.async_call(DOMAIN, "set_profiling", {"enabled": True}, blocking=True)
+
+    # An unchanged device list would skip decoding and normalization
+    elica_cloud.hoods["hood1"].caps.update({"64": 1, "110": 1})
+    await coordinator.async_refresh()
+    fan = er.async_get(hass).async_get_entity_id("fan", DOMAIN, "hood1_fan")
+    await hass.services.async_call("fan", "turn_off", {"entity_id": fan}, blocking=True)
+    await hass.services.async_call(DOMAIN, "set_profiling", {"enabled": False}, blocking=True)
+
+    report = api.profiler.as_dict()
+    assert not report["enabled"]
+    assert {"devices_get", "json_decode", "normalize", "state_write", "send_capabilities"} <= set(
+        report["phases"]
+    )
@@ -0,0 +1,76 @@
+"""Tests for client-side transitions."""
+import asyncio
+from unittest.mock import patch
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.elica_getup.const import DOMAIN, TRANSITION_STEP_BUDGET
+from custom_components.elica_getup.transitions import ElicaTransitions
+
+
+async def test_steps_come_from_the_budget(hass) -> None:
+    """Longer transitions get more steps, up to the per-hood budget."""
+    transitions = ElicaTransitions(hass)
+
+    assert transitions.plan(0, 100, 10) == [(0.0, 33), (10 / 3, 67), (20 / 3, 100)]
+    assert len(transitions.plan(0, 100, 3600)) == TRANSITION_STEP_BUDGET
+    # Never more steps than values to go through, and at least one
+    assert [value for _, value in transitions.plan(1, 3, 3600)] == [2, 3]
+    assert transitions.plan(0, 100, 0.5) == [(0.0, 100)]
+
+
+async def test_stale_steps_are_skipped(hass) -> None:
+    """A step due while an earlier one is still being sent is dropped."""
+    transitions = ElicaTransitions(hass)
+    sent = []
+
+    async def _send(caps):
+        sent.append(caps["96"])
+        await asyncio.sleep(0.05)
+
+    transitions.async_start("hood1", [(0, {"96": 10}), (0.01, {"96": 20}), (0.03, {"96": 30})], _send)
+    await asyncio.sleep(0.1)
+
+    assert sent == [10, 30]
+
+
+async def test_only_overlapping_commands_cancel(hass) -> None:
+    """A transition survives commands for other capabilities."""
+    transitions = ElicaTransitions(hass)
+    sent = []
+
+    async def _send(caps):
+        sent.append(caps["96"])
+
+    transitions.async_start("hood1", [(0, {"96": 10}), (0.05, {"96": 20})], _send)
+    await asyncio.sleep(0.01)
+    transitions.async_cancel("hood1", {"110": 0})
+    transitions.async_cancel("hood2", {"96": 0})
+    await asyncio.sleep(0.01)
+    transitions.async_cancel("hood1", {"96": 0})
+    await asyncio.sleep(0.1)
+
+    assert sent == [10]
+
+
+async def test_light_fades_in_steps(hass, elica_cloud, init_integration) -> None:
+    """A light transition is a few commands, cut short by a new command."""
+    elica_cloud.hoods["hood1"].caps["53"] = 1
+    await hass.data[DOMAIN][init_integration.entry_id]["coordinator"].async_refresh()
+    light = er.async_get(hass).async_get_entity_id("light", DOMAIN, "hood1_light")
+
+    with patch("custom_components.elica_getup.transitions._TRANSITION_RATE", 5):
+        await hass.services.async_call(
+            "light", "turn_on", {"entity_id": light, "brightness": 255, "transition": 0.6}, blocking=True
+        )
+        await asyncio.sleep(0.7)
+        await hass.async_block_till_done()
+        assert [caps["96"] for _, caps in elica_cloud.commands] == [33, 67, 100]
+
+        await hass.services.async_call("light", "turn_off", {"entity_id": light, "transition": 0.6}, blocking=True)
+        await asyncio.sleep(0.1)
+        await hass.services.async_call("light", "turn_on", {"entity_id": light, "brightness": 128}, blocking=True)
+        await asyncio.sleep(0.7)
+        await hass.async_block_till_done()
+
+    assert [caps["96"] for _, caps in elica_cloud.commands[3:]] == [67, 50]